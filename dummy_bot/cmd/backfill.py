@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import logging
+import sys
+
+from dummy_bot.config.config import get_config
+from dummy_bot.internal.database.postgres.client import PostgresClient
+from dummy_bot.internal.database.transactional.uow import UOW
+from dummy_bot.internal.repository.statistics import StatisticsRepository
+
+
+async def backfill(database: PostgresClient) -> None:
+    async with database.get_sessionmaker()() as session:
+        async with UOW.with_tx(session):
+            await StatisticsRepository.rebuild_daily_counts(session)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Rebuild pokak_daily_counts from raw pokaks')
+    parser.add_argument('--env', help='Path to .env file')
+    args = parser.parse_args()
+
+    cfg = get_config(args.env)
+
+    asyncio.run(backfill(PostgresClient(cfg=cfg.database)))
+    logging.info("pokak_daily_counts rebuilt")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+    )
+    main()
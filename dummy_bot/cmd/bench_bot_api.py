@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import List
+
+from aiogram import Bot
+from aiogram.client.telegram import TelegramAPIServer
+
+from dummy_bot.internal.utils.bot_session import HTTP_CONNECTIONS, TunedAiohttpSession
+from dummy_bot.internal.utils.fake_bot_api import start_fake_api
+
+TOKEN = "42:bench"
+
+
+async def bench(api_url: str, limit: int, keepalive: float, concurrency: int, requests: int) -> None:
+    session = TunedAiohttpSession(
+        limit=limit,
+        keepalive_timeout=keepalive,
+        api=TelegramAPIServer.from_base(api_url),
+    )
+    bot = Bot(token=TOKEN, session=session)
+    new_before, reused_before = HTTP_CONNECTIONS.value("new"), HTTP_CONNECTIONS.value("reused")
+
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await bot.delete_message(chat_id=1, message_id=1)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        await session.close()
+    elapsed = time.perf_counter() - started
+
+    new = HTTP_CONNECTIONS.value("new") - new_before
+    reused = HTTP_CONNECTIONS.value("reused") - reused_before
+    logging.info(
+        f"limit={limit} keepalive={keepalive}s concurrency={concurrency}: "
+        f"{requests / elapsed:.0f} calls/s, {new:.0f} new connections, "
+        f"reuse ratio {reused / (new + reused) if new + reused else 0:.2f}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    runner = None
+    api_url = args.api_url
+    if api_url is None:
+        runner = await start_fake_api(args.host, args.port, args.latency, args.server_close)
+        api_url = f"http://{args.host}:{args.port}"
+
+    try:
+        limits: List[int] = [int(limit) for limit in args.limits.split(',')]
+        for limit in limits:
+            await bench(api_url, limit, args.keepalive, args.concurrency, args.requests)
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark Bot API calls/sec against a local fake Bot API server')
+    parser.add_argument('--api-url', help='Existing Bot API server, e.g. http://localhost:8081; by default a fake one is started')
+    parser.add_argument('--host', default='127.0.0.1', help='Fake server host')
+    parser.add_argument('--port', type=int, default=8089, help='Fake server port')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fake server response delay, seconds')
+    parser.add_argument('--server-close', action='store_true', help='Fake server closes every connection (no keep-alive)')
+    parser.add_argument('--limits', default='1,10,100', help='Connection pool sizes to compare, comma-separated')
+    parser.add_argument('--keepalive', type=float, default=60, help='Keep-alive timeout, seconds')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent callers')
+    parser.add_argument('--requests', type=int, default=5000, help='Requests per run')
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+    )
+    main()
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from dummy_bot.config.config import get_config
+from dummy_bot.internal.database.postgres.client import PostgresClient
+from dummy_bot.internal.database.transactional.uow import UOW
+from dummy_bot.internal.dto.dto import PokakRecordDTO, TelegramMessageDTO
+from dummy_bot.internal.models.models import Group, User, Media, Pokak, PokakDailyCount
+from dummy_bot.internal.repository.group import GroupRepository
+from dummy_bot.internal.repository.media import MediaRepository
+from dummy_bot.internal.repository.pokak import PokakRepository
+from dummy_bot.internal.repository.user import UserRepository
+from dummy_bot.internal.usecase.pokak_batch import PokakBatchWriter
+from dummy_bot.internal.utils.report_cache import ReportCache
+
+MEDIA_UID = "bench-media"
+
+
+async def seed(session_pool: async_sessionmaker, users: int) -> TelegramMessageDTO:
+    """Отдельная группа со своими участниками и медиа, удаляется в cleanup"""
+    chat_id = -random.randint(10 ** 12, 10 ** 13)
+    async with session_pool() as session:
+        async with UOW.with_tx(session):
+            group = await GroupRepository.insert(session, Group(group_id=chat_id))
+            await MediaRepository.insert(session, Media(group_id=group.id, media_unique_id=MEDIA_UID))
+            for user_chat_id in range(1, users + 1):
+                await UserRepository.insert(session, User(chat_id=user_chat_id, group_id=group.id))
+    return TelegramMessageDTO(chat_id, 1, None, None, None, MEDIA_UID)
+
+
+async def cleanup(session_pool: async_sessionmaker, chat_id: int) -> None:
+    async with session_pool() as session:
+        async with UOW.with_tx(session):
+            group = await GroupRepository.get_by_chat_id(session, chat_id)
+            members = select(User.id).where(User.group_id == group.id)
+            await session.execute(delete(Pokak).where(Pokak.user_id.in_(members)))
+            await session.execute(delete(PokakDailyCount).where(PokakDailyCount.user_id.in_(members)))
+            await session.execute(delete(User).where(User.group_id == group.id))
+            await session.execute(delete(Media).where(Media.group_id == group.id))
+            await session.execute(delete(Group).where(Group.id == group.id))
+
+
+async def add_legacy(session: AsyncSession, dto: TelegramMessageDTO) -> bool:
+    """Прежний путь PokakUseCase.add: три SELECT, INSERT и refresh"""
+    async with UOW.with_tx(session):
+        group = await GroupRepository.get_by_chat_id(session, dto.chat_id)
+        if not group:
+            return False
+
+        user = await UserRepository.get_by_group_and_user_chat_id(session, dto.user_chat_id, group)
+        if not user or not user.is_active:
+            return False
+
+        media = await MediaRepository.get_by_group(session, group)
+        if not media or dto.media_file_unique_id != media.media_unique_id:
+            return False
+
+        pokak = await PokakRepository.insert(session, Pokak(user_id=user.id))
+        await session.refresh(pokak)
+        return True
+
+
+async def add_fused(session: AsyncSession, dto: TelegramMessageDTO) -> bool:
+    async with UOW.with_tx(session):
+        user_id = await PokakRepository.insert_if_tracked(session, dto.chat_id, dto.user_chat_id, dto.media_file_unique_id)
+    return user_id is not None
+
+
+async def measure_latency(session_pool: async_sessionmaker, add: Callable[[AsyncSession, TelegramMessageDTO], Awaitable[bool]],
+                          dto: TelegramMessageDTO, requests: int) -> List[float]:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with session_pool() as session:
+            if not await add(session, dto):
+                raise RuntimeError("pokak was not recorded")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    logging.info(
+        f"{name}: p50 {q[49] * 1000:.2f}ms, p95 {q[94] * 1000:.2f}ms, p99 {q[98] * 1000:.2f}ms, "
+        f"mean {statistics.fmean(latencies) * 1000:.2f}ms"
+    )
+
+
+async def bench_latency(session_pool: async_sessionmaker, dto: TelegramMessageDTO, args: argparse.Namespace) -> None:
+    # прогрев: соединения пула и кэш подготовленных запросов asyncpg
+    await measure_latency(session_pool, add_legacy, dto, 50)
+    await measure_latency(session_pool, add_fused, dto, 50)
+
+    report("legacy select+insert+refresh", await measure_latency(session_pool, add_legacy, dto, args.requests))
+    report("fused insert ... select", await measure_latency(session_pool, add_fused, dto, args.requests))
+
+
+class NoLeaderboard:
+    """Рейтинг в redis не участвует в сравнении записи в БД"""
+
+    async def increment(self, chat_id: int, user_id: int) -> None: ...
+
+
+async def throughput_per_message(session_pool: async_sessionmaker, dto: TelegramMessageDTO, args: argparse.Namespace) -> float:
+    """Запись без write-behind: транзакция и COMMIT на каждый покак, concurrency хендлеров параллельно"""
+    remaining = args.rows
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            # покаки разных участников, как в живой группе: не упираемся в одну строку pokak_daily_counts
+            user_dto = replace(dto, user_chat_id=remaining % args.users + 1)
+            async with session_pool() as session:
+                if not await add_fused(session, user_dto):
+                    raise RuntimeError("pokak was not recorded")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return args.rows / (time.perf_counter() - started)
+
+
+async def throughput_batched(session_pool: async_sessionmaker, dto: TelegramMessageDTO, args: argparse.Namespace) -> float:
+    writer = PokakBatchWriter(
+        session_pool=session_pool,
+        pokak_repo=PokakRepository(),
+        leaderboard_repo=NoLeaderboard(),
+        report_cache=ReportCache(),
+        uow=UOW(),
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval_ms / 1000,
+    )
+    await writer.start()
+
+    started = time.perf_counter()
+    for i in range(args.rows):
+        await writer.put(PokakRecordDTO(dto.chat_id, i % args.users + 1, dto.media_file_unique_id, datetime.now()))
+    # stop дожидается записи всей очереди
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+
+    if writer.written != args.rows:
+        raise RuntimeError(f"written {writer.written} of {args.rows} pokaks, dropped {writer.dropped}")
+    return args.rows / elapsed
+
+
+async def bench_throughput(session_pool: async_sessionmaker, dto: TelegramMessageDTO, args: argparse.Namespace) -> None:
+    per_message = await throughput_per_message(session_pool, dto, args)
+    batched = await throughput_batched(session_pool, dto, args)
+    logging.info(
+        f"rows={args.rows} concurrency={args.concurrency} batch_size={args.batch_size}: "
+        f"commit per message {per_message:.0f} rows/s, write-behind batches {batched:.0f} rows/s"
+    )
+
+
+async def run(database: PostgresClient, args: argparse.Namespace) -> None:
+    session_pool = database.get_sessionmaker()
+    dto = await seed(session_pool, args.users)
+    try:
+        if args.mode in ('latency', 'all'):
+            await bench_latency(session_pool, dto, args)
+        if args.mode in ('throughput', 'all'):
+            await bench_throughput(session_pool, dto, args)
+    finally:
+        await cleanup(session_pool, dto.chat_id)
+        await database.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark pokak recording latency and throughput against the configured Postgres')
+    parser.add_argument('--env', help='Path to .env file')
+    parser.add_argument('--requests', type=int, default=2000, help='Recorded pokaks per path')
+    parser.add_argument('--users', type=int, default=100, help='Members of the seeded group')
+    parser.add_argument('--mode', choices=['latency', 'throughput', 'all'], default='all',
+                        help='latency - fused vs legacy recording, throughput - rows/sec of write-behind vs commit per message')
+    parser.add_argument('--rows', type=int, default=20000, help='Recorded pokaks per throughput run')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent handlers committing per message')
+    parser.add_argument('--batch-size', type=int, default=100, help='Write-behind batch size')
+    parser.add_argument('--flush-interval-ms', type=int, default=50, help='Write-behind flush interval')
+    args = parser.parse_args()
+
+    cfg = get_config(args.env)
+
+    asyncio.run(run(PostgresClient(cfg=cfg.database), args))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+    )
+    main()
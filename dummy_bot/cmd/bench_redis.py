@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Tuple
+
+from redis import Redis
+
+from dummy_bot.config.config import get_config, RedisConfig
+from dummy_bot.internal.database.redis.client import RedisClient
+
+ADMINS_KEY = "bench:admins"
+
+
+class LatencyProxy:
+    """
+    TCP-прокси к redis с задержкой rtt/2 в каждую сторону - имитация сети между ботом и redis.
+    Работает в своём потоке: синхронный клиент блокирует цикл событий бенчмарка
+    """
+
+    def __init__(self, target: Tuple[str, int], rtt: float) -> None:
+        self._target = target
+        self._delay = rtt / 2
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self.port = 0
+        threading.Thread(target=self._run, name="latency-proxy", daemon=True).start()
+        self._started.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+
+    async def _handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        upstream_reader, upstream_writer = await asyncio.open_connection(*self._target)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer),
+            self._pipe(upstream_reader, client_writer),
+            return_exceptions=True,
+        )
+
+    async def _pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(self._delay)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def run_updates(get_admins: Callable[[], Awaitable], updates: int, concurrency: int, handler_latency: float) -> float:
+    """
+    Апдейты с командой для админов: чтение списка админов из redis,
+    затем остальная работа хендлера (ответ в Telegram), имитируемая задержкой
+    """
+    remaining = updates
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await get_admins()
+            await asyncio.sleep(handler_latency)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return updates / (time.perf_counter() - started)
+
+
+async def bench_blocking(cfg: RedisConfig, args: argparse.Namespace) -> float:
+    # как было до перехода на redis.asyncio: синхронный клиент внутри async def
+    client = Redis(**cfg.connection_kwargs)
+
+    async def get_admins():
+        return client.get(f"{cfg.db}:{ADMINS_KEY}")
+
+    try:
+        return await run_updates(get_admins, args.updates, args.concurrency, args.handler_latency)
+    finally:
+        client.close()
+
+
+async def bench_async(cfg: RedisConfig, args: argparse.Namespace) -> float:
+    client = RedisClient(cfg)
+
+    async def get_admins():
+        return await client.get(ADMINS_KEY)
+
+    try:
+        await client.set(ADMINS_KEY, "1,2,3", expire=60)
+        return await run_updates(get_admins, args.updates, args.concurrency, args.handler_latency)
+    finally:
+        await client.shutdown()
+
+
+async def bench(cfg: RedisConfig, args: argparse.Namespace) -> None:
+    after = await bench_async(cfg, args)
+    before = await bench_blocking(cfg, args)
+    logging.info(
+        f"concurrency={args.concurrency} handler_latency={args.handler_latency * 1000:.0f}ms "
+        f"rtt={args.rtt * 1000:.1f}ms: "
+        f"blocking client {before:.0f} updates/s, redis.asyncio pool {after:.0f} updates/s"
+    )
+
+
+def with_latency(cfg: RedisConfig, rtt: float) -> RedisConfig:
+    if not rtt:
+        return cfg
+    proxy = LatencyProxy((cfg.host, cfg.port), rtt)
+    return cfg.model_copy(update={"host": "127.0.0.1", "port": proxy.port})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark admin-gated updates/sec with blocking vs asyncio redis clients')
+    parser.add_argument('--env', help='Path to .env file')
+    parser.add_argument('--updates', type=int, default=5000, help='Updates per run')
+    parser.add_argument('--concurrency', type=int, default=100, help='Concurrently processed updates')
+    parser.add_argument('--handler-latency', type=float, default=0.02, help='Rest of the handler, seconds')
+    parser.add_argument('--rtt', type=float, default=0.001,
+                        help='Network round-trip added by a local proxy in front of redis, seconds; 0 connects directly')
+    args = parser.parse_args()
+
+    cfg = get_config(args.env)
+
+    asyncio.run(bench(with_latency(cfg.redis, args.rtt), args))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+    )
+    main()
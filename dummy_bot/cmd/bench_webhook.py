@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from dummy_bot.config.config import get_config
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def load_updates(path: str | None, chats: int) -> List[Dict[str, Any]]:
+    """
+    Апдейты из файла, по одному JSON на строку (например, result из getUpdates);
+    без файла - текстовые сообщения от chats разных групп
+    """
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    return [
+        {
+            "update_id": 0,
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": -(10 ** 12) - chat, "type": "supergroup", "title": "bench"},
+                "from": {"id": chat + 1, "is_bot": False, "first_name": "Bench"},
+                "text": "bench",
+            },
+        }
+        for chat in range(chats)
+    ]
+
+
+async def post_updates(url: str, secret: str | None, updates: List[Dict[str, Any]],
+                       requests: int, concurrency: int) -> tuple[List[float], float]:
+    headers = {SECRET_HEADER: secret} if secret else {}
+    latencies: List[float] = []
+    sent = 0
+
+    async with ClientSession(connector=TCPConnector(limit=concurrency), timeout=ClientTimeout(total=30)) as session:
+        async def worker() -> None:
+            nonlocal sent
+            while sent < requests:
+                # update_id уникален, как у настоящих апдейтов
+                update = {**updates[sent % len(updates)], "update_id": sent + 1}
+                sent += 1
+
+                start = time.perf_counter()
+                async with session.post(url, json=update, headers=headers) as response:
+                    await response.read()
+                    if response.status != 200:
+                        raise RuntimeError(f"webhook responded {response.status}")
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, time.perf_counter() - started
+
+
+def report(latencies: List[float], elapsed: float) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    logging.info(
+        f"{len(latencies) / elapsed:.0f} updates/s, p50 {q[49] * 1000:.2f}ms, p95 {q[94] * 1000:.2f}ms, "
+        f"p99 {q[98] * 1000:.2f}ms, mean {statistics.fmean(latencies) * 1000:.2f}ms"
+    )
+
+
+async def run(url: str, secret: str | None, updates: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    # прогрев: соединения и пулы бота
+    await post_updates(url, secret, updates, min(args.requests, 100), args.concurrency)
+
+    logging.info(f"POST {args.requests} updates to {url}, concurrency={args.concurrency}")
+    report(*await post_updates(url, secret, updates, args.requests, args.concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark webhook latency and throughput by POSTing recorded updates')
+    parser.add_argument('--env', help='Path to .env file of the running bot')
+    parser.add_argument('--url', help='Webhook URL; by default http://127.0.0.1:WEBHOOK_PORT/WEBHOOK_PATH')
+    parser.add_argument('--updates-file', help='Recorded updates, one JSON object per line')
+    parser.add_argument('--chats', type=int, default=100, help='Distinct chats of generated updates without --updates-file')
+    parser.add_argument('--requests', type=int, default=5000, help='Updates to POST')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent requests, like Telegram max_connections')
+    args = parser.parse_args()
+
+    cfg = get_config(args.env).webhook
+    url = args.url or f"http://127.0.0.1:{cfg.port}{cfg.path}"
+
+    asyncio.run(run(url, cfg.get_secret_token, load_updates(args.updates_file, args.chats), args))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+    )
+    main()
@@ -5,15 +5,22 @@ import sys
 
 from dummy_bot.config.config import get_config
 from dummy_bot.internal.app.app import App
+from dummy_bot.internal.app.workers import run_with_workers
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument('--env', help='Path to .env file')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Number of worker processes; updates are sharded between them by chat id')
     args = parser.parse_args()
 
     cfg = get_config(args.env)
 
+    if args.workers > 0:
+        run_with_workers(cfg, args.workers)
+        return
+
     app = App(cfg)
 
     asyncio.run(app.run())
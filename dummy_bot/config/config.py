@@ -1,6 +1,6 @@
 from pydantic import BaseModel, SecretStr, Field, field_validator, ConfigDict
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Optional, List
 from functools import lru_cache
 import re
 import os
@@ -17,10 +17,16 @@ class DatabaseConfig(BaseModel):
     max_connections: int = Field(20, validation_alias="DB_MAX_CONNECTIONS")
     timeout: int = Field(30, validation_alias="DB_TIMEOUT")
     pool_size: int = Field(10, validation_alias="DB_POOL_SIZE")
+    pool_recycle: int = Field(1800, validation_alias="DB_POOL_RECYCLE")
+    pool_pre_ping: bool = Field(True, validation_alias="DB_POOL_PRE_PING")
+    statement_cache_size: int = Field(100, validation_alias="DB_STATEMENT_CACHE_SIZE")
+    replica_dsns: List[SecretStr] = Field([], validation_alias="DB_REPLICA_DSNS")
+    replica_check_interval: int = Field(5, validation_alias="DB_REPLICA_CHECK_INTERVAL")
 
     model_config = ConfigDict(
         frozen=True,
         validate_assignment=True,
+        populate_by_name=True,
         json_encoders={
             SecretStr: lambda v: '********'
         }
@@ -40,13 +46,57 @@ class DatabaseConfig(BaseModel):
             raise ValueError('Invalid host format')
         return v
 
-    @field_validator('max_connections', 'timeout', 'pool_size')
+    @field_validator('max_connections', 'timeout', 'pool_size', 'pool_recycle', 'replica_check_interval')
     @classmethod
     def validate_positive(cls, v: int) -> int:
         if v <= 0:
             raise ValueError('Value must be positive')
         return v
 
+    @field_validator('statement_cache_size')
+    @classmethod
+    def validate_non_negative(cls, v: int) -> int:
+        if v < 0:
+            raise ValueError('Value must not be negative')
+        return v
+
+    @field_validator('replica_dsns')
+    @classmethod
+    def validate_replica_dsns(cls, v: List[SecretStr]) -> List[SecretStr]:
+        dsns = []
+        for dsn in v:
+            value = dsn.get_secret_value()
+            if value.startswith('postgresql://'):
+                value = value.replace('postgresql://', 'postgresql+asyncpg://', 1)
+            if not value.startswith('postgresql+asyncpg://'):
+                raise ValueError('Replica DSN must be a postgresql:// URL')
+            dsns.append(SecretStr(value))
+        return dsns
+
+    @property
+    def replica_urls(self) -> List[str]:
+        """URL реплик с паролями - только для подключения"""
+        return [dsn.get_secret_value() for dsn in self.replica_dsns]
+
+    @property
+    def max_overflow(self) -> int:
+        """Соединения сверх pool_size, чтобы всего было не больше max_connections"""
+        return max(0, self.max_connections - self.pool_size)
+
+    @property
+    def engine_kwargs(self) -> dict:
+        """Параметры для create_async_engine()"""
+        return {
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'pool_timeout': self.timeout,
+            'pool_recycle': self.pool_recycle,
+            'pool_pre_ping': self.pool_pre_ping,
+            'connect_args': {
+                'statement_cache_size': self.statement_cache_size,
+            },
+        }
+
     @property
     def url(self) -> str:
         """Полный URL с паролем - только для подключения"""
@@ -67,19 +117,35 @@ class DatabaseConfig(BaseModel):
         data = super().model_dump(**kwargs)
         data['password'] = '********'
         data['url'] = self.safe_url
+        data['replica_dsns'] = ['********'] * len(self.replica_dsns)
         return data
 
 
 class TelegramConfig(BaseModel):
     token: SecretStr
+    # HTTP-сессия к Bot API: пул keep-alive соединений, кэш DNS, таймауты
+    api_url: Optional[str] = Field(None, validation_alias="TG_API_URL")
+    connection_limit: int = Field(100, validation_alias="TG_CONNECTION_LIMIT")
+    keepalive_timeout: float = Field(60, validation_alias="TG_KEEPALIVE_TIMEOUT")
+    dns_cache_ttl: int = Field(3600, validation_alias="TG_DNS_CACHE_TTL")
+    connect_timeout: float = Field(5, validation_alias="TG_CONNECT_TIMEOUT")
+    request_timeout: float = Field(60, validation_alias="TG_REQUEST_TIMEOUT")
 
     model_config = ConfigDict(
         frozen=True,
+        populate_by_name=True,
         json_encoders={
             SecretStr: lambda v: '********'
         }
     )
 
+    @field_validator('connection_limit', 'keepalive_timeout', 'dns_cache_ttl', 'connect_timeout', 'request_timeout')
+    @classmethod
+    def validate_positive(cls, v: float) -> float:
+        if v <= 0:
+            raise ValueError('Value must be positive')
+        return v
+
     @property
     def get_token(self) -> str:
         return f"{self.token.get_secret_value()}"
@@ -107,9 +173,11 @@ class RedisConfig(BaseModel):
     decode_responses: bool = Field(True, validation_alias="REDIS_DECODE_RESPONSES")
     health_check_interval: int = Field(15, validation_alias="REDIS_HEALTH_CHECK_INTERVAL")
     ssl: bool = Field(False, validation_alias="REDIS_SSL")
+    fsm_ttl: int = Field(900, validation_alias="REDIS_FSM_TTL")
 
     model_config = ConfigDict(
         frozen=True,
+        populate_by_name=True,
         json_encoders={
             SecretStr: lambda v: '********'
         }
@@ -129,7 +197,7 @@ class RedisConfig(BaseModel):
             raise ValueError('Redis DB must be between 0 and 15')
         return v
 
-    @field_validator('socket_timeout', 'socket_connect_timeout', 'max_connections', 'health_check_interval')
+    @field_validator('socket_timeout', 'socket_connect_timeout', 'max_connections', 'health_check_interval', 'fsm_ttl')
     @classmethod
     def validate_positive(cls, v: int) -> int:
         if v <= 0:
@@ -179,6 +247,59 @@ class RedisConfig(BaseModel):
         return data
 
 
+class WebhookConfig(BaseModel):
+    """Конфигурация webhook-режима"""
+    url: str = ""
+    path: str = "/webhook"
+    host: str = "0.0.0.0"
+    port: int = 443
+    secret_token: Optional[SecretStr] = None
+    ssl_cert: Optional[str] = None
+    ssl_key: Optional[str] = None
+
+    model_config = ConfigDict(
+        frozen=True,
+        json_encoders={
+            SecretStr: lambda v: '********'
+        }
+    )
+
+    @field_validator('port')
+    @classmethod
+    def validate_port(cls, v: int) -> int:
+        if not 1 <= v <= 65535:
+            raise ValueError('Port must be between 1 and 65535')
+        return v
+
+    @field_validator('path')
+    @classmethod
+    def validate_path(cls, v: str) -> str:
+        if not v.startswith('/'):
+            raise ValueError('Webhook path must start with "/"')
+        return v
+
+    @field_validator('secret_token')
+    @classmethod
+    def validate_secret_token(cls, v: Optional[SecretStr]) -> Optional[SecretStr]:
+        # ограничения Bot API для X-Telegram-Bot-Api-Secret-Token
+        if v and not re.match(r"^[A-Za-z0-9_-]{1,256}$", v.get_secret_value()):
+            raise ValueError('Secret token must be 1-256 characters: A-Z, a-z, 0-9, _ and -')
+        return v
+
+    @property
+    def full_url(self) -> str:
+        return f"{self.url.rstrip('/')}{self.path}"
+
+    @property
+    def get_secret_token(self) -> Optional[str]:
+        return self.secret_token.get_secret_value() if self.secret_token else None
+
+    def model_dump(self, **kwargs) -> dict:
+        data = super().model_dump(**kwargs)
+        data['secret_token'] = '********' if self.secret_token else None
+        return data
+
+
 # ==================== ГЛАВНАЯ СТРУКТУРА КОНФИГА ====================
 
 class AppConfig(BaseSettings):
@@ -188,10 +309,52 @@ class AppConfig(BaseSettings):
     name: str = Field("myapp", validation_alias="APP_NAME")
     version: str = "1.0.0"
 
+    # polling | webhook
+    bot_mode: str = Field("polling", validation_alias="BOT_MODE")
+
+    # all - всё в одном процессе; gateway - принимает апдейты и раскладывает их по шардам
+    # в redis streams; worker - обрабатывает апдейты своих шардов
+    bot_role: str = Field("all", validation_alias="BOT_ROLE")
+    bot_shards: int = Field(1, validation_alias="BOT_SHARDS")
+    # номера шардов воркера через запятую; либо номер воркера из BOT_WORKERS,
+    # тогда воркер берёт шарды index, index + BOT_WORKERS, ...
+    bot_worker_shards: str = Field("", validation_alias="BOT_WORKER_SHARDS")
+    bot_worker_index: Optional[int] = Field(None, validation_alias="BOT_WORKER_INDEX")
+    bot_workers: int = Field(1, validation_alias="BOT_WORKERS")
+    updates_stream_maxlen: int = Field(100_000, validation_alias="UPDATES_STREAM_MAXLEN")
+
+    # write-behind запись покаков пачками
+    pokak_write_behind: bool = Field(False, validation_alias="POKAK_WRITE_BEHIND")
+    pokak_batch_size: int = Field(100, validation_alias="POKAK_BATCH_SIZE")
+    pokak_flush_interval_ms: int = Field(50, validation_alias="POKAK_FLUSH_INTERVAL_MS")
+
+    # prometheus метрики на http://metrics_host:metrics_port/metrics, 0 - выключено
+    metrics_host: str = Field("127.0.0.1", validation_alias="METRICS_HOST")
+    metrics_port: int = Field(0, validation_alias="METRICS_PORT")
+
+    # логирование: очередь до потока записи, orjson при наличии, доля логов успешных покаков
+    log_queue_size: int = Field(10_000, validation_alias="LOG_QUEUE_SIZE")
+    log_fast_json: bool = Field(True, validation_alias="LOG_FAST_JSON")
+    log_text_success_sample_rate: float = Field(1.0, validation_alias="LOG_TEXT_SUCCESS_SAMPLE_RATE")
+
+    # трейсинг апдейтов: none | memory | file (JSON lines в tracing_file)
+    tracing_exporter: str = Field("none", validation_alias="TRACING_EXPORTER")
+    tracing_file: str = Field("traces.jsonl", validation_alias="TRACING_FILE")
+    tracing_sample_rate: float = Field(1.0, validation_alias="TRACING_SAMPLE_RATE")
+
+    # лимиты исходящих запросов к Bot API на процесс
+    outbound_global_rate: float = Field(30, validation_alias="OUTBOUND_GLOBAL_RATE")
+    outbound_group_rate_per_minute: float = Field(20, validation_alias="OUTBOUND_GROUP_RATE_PER_MINUTE")
+    outbound_chat_burst: float = Field(5, validation_alias="OUTBOUND_CHAT_BURST")
+
+    # список админов чата, где бот админ и получает chat_member апдейты, секунды
+    admins_cache_ttl: int = Field(6 * 3600, validation_alias="ADMINS_CACHE_TTL")
+
     # Вложенные структуры - объявляем как Optional
     database: Optional[DatabaseConfig] = None
     redis: Optional[RedisConfig] = None
     telegram: Optional[TelegramConfig] = None
+    webhook: Optional[WebhookConfig] = None
 
     # Pydantic V2 settings config
     model_config = SettingsConfigDict(
@@ -202,6 +365,82 @@ class AppConfig(BaseSettings):
         frozen=True  # Весь конфиг иммутабельный
     )
 
+    @field_validator('pokak_batch_size', 'pokak_flush_interval_ms', 'bot_shards', 'bot_workers', 'updates_stream_maxlen',
+                     'admins_cache_ttl', 'log_queue_size')
+    @classmethod
+    def validate_positive(cls, v: int) -> int:
+        if v <= 0:
+            raise ValueError('Value must be positive')
+        return v
+
+    @field_validator('bot_mode')
+    @classmethod
+    def validate_bot_mode(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ('polling', 'webhook'):
+            raise ValueError('Bot mode must be "polling" or "webhook"')
+        return v
+
+    @field_validator('metrics_port')
+    @classmethod
+    def validate_metrics_port(cls, v: int) -> int:
+        if not 0 <= v <= 65535:
+            raise ValueError('Port must be between 0 and 65535')
+        return v
+
+    @field_validator('log_text_success_sample_rate', 'tracing_sample_rate')
+    @classmethod
+    def validate_sample_rate(cls, v: float) -> float:
+        if not 0 <= v <= 1:
+            raise ValueError('Sample rate must be between 0 and 1')
+        return v
+
+    @field_validator('outbound_global_rate', 'outbound_group_rate_per_minute', 'outbound_chat_burst')
+    @classmethod
+    def validate_positive_rate(cls, v: float) -> float:
+        if v <= 0:
+            raise ValueError('Value must be positive')
+        return v
+
+    @field_validator('tracing_exporter')
+    @classmethod
+    def validate_tracing_exporter(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ('none', 'memory', 'file'):
+            raise ValueError('Tracing exporter must be "none", "memory" or "file"')
+        return v
+
+    @field_validator('bot_role')
+    @classmethod
+    def validate_bot_role(cls, v: str) -> str:
+        v = v.lower()
+        if v not in ('all', 'gateway', 'worker'):
+            raise ValueError('Bot role must be "all", "gateway" or "worker"')
+        return v
+
+    @property
+    def worker_shards(self) -> List[int]:
+        """Шарды, которые обрабатывает этот воркер"""
+        if self.bot_worker_shards.strip():
+            shards = sorted({int(shard) for shard in self.bot_worker_shards.split(',') if shard.strip()})
+            if not all(0 <= shard < self.bot_shards for shard in shards):
+                raise ValueError(f'Worker shards must be between 0 and {self.bot_shards - 1}')
+            return shards
+
+        if self.bot_worker_index is not None:
+            if not 0 <= self.bot_worker_index < self.bot_workers:
+                raise ValueError(f'Worker index must be between 0 and {self.bot_workers - 1}')
+            shards = list(range(self.bot_worker_index, self.bot_shards, self.bot_workers))
+            if not shards:
+                raise ValueError(f'Worker {self.bot_worker_index} has no shards: BOT_WORKERS exceeds BOT_SHARDS')
+            return shards
+
+        # все шарды в одном воркере - только без явной роли worker: реплики воркеров
+        # с пустым списком читали бы все шарды наперегонки
+        if self.bot_role == 'worker':
+            raise ValueError('Worker role requires BOT_WORKER_SHARDS or BOT_WORKER_INDEX')
+        return list(range(self.bot_shards))
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -215,7 +454,14 @@ class AppConfig(BaseSettings):
                 ssl_mode=self._get_env('DB_SSL_MODE', 'disable'),
                 max_connections=int(self._get_env('DB_MAX_CONNECTIONS', '20')),
                 timeout=int(self._get_env('DB_TIMEOUT', '30')),
-                pool_size=int(self._get_env('DB_POOL_SIZE', '10'))
+                pool_size=int(self._get_env('DB_POOL_SIZE', '10')),
+                pool_recycle=int(self._get_env('DB_POOL_RECYCLE', '1800')),
+                pool_pre_ping=self._get_bool('DB_POOL_PRE_PING', True),
+                statement_cache_size=int(self._get_env('DB_STATEMENT_CACHE_SIZE', '100')),
+                replica_dsns=[
+                    SecretStr(dsn.strip()) for dsn in self._get_env('DB_REPLICA_DSNS', '').split(',') if dsn.strip()
+                ],
+                replica_check_interval=int(self._get_env('DB_REPLICA_CHECK_INTERVAL', '5')),
             ))
 
         if self.redis is None:
@@ -231,15 +477,44 @@ class AppConfig(BaseSettings):
                 max_connections=int(self._get_env('REDIS_MAX_CONNECTIONS', '20')),
                 decode_responses=self._get_bool('REDIS_DECODE_RESPONSES', True),
                 health_check_interval=int(self._get_env('REDIS_HEALTH_CHECK_INTERVAL', '15')),
-                ssl=self._get_bool('REDIS_SSL', False)
+                ssl=self._get_bool('REDIS_SSL', False),
+                fsm_ttl=int(self._get_env('REDIS_FSM_TTL', '900')),
             ))
 
         if self.telegram is None:
             token = self._get_env('TG_TOKEN', '')
             object.__setattr__(self, 'telegram', TelegramConfig(
-                token=SecretStr(token) if token else None
+                token=SecretStr(token) if token else None,
+                api_url=self._get_env('TG_API_URL', '') or None,
+                connection_limit=int(self._get_env('TG_CONNECTION_LIMIT', '100')),
+                keepalive_timeout=float(self._get_env('TG_KEEPALIVE_TIMEOUT', '60')),
+                dns_cache_ttl=int(self._get_env('TG_DNS_CACHE_TTL', '3600')),
+                connect_timeout=float(self._get_env('TG_CONNECT_TIMEOUT', '5')),
+                request_timeout=float(self._get_env('TG_REQUEST_TIMEOUT', '60')),
+            ))
+
+        if self.webhook is None:
+            secret_token = self._get_env('WEBHOOK_SECRET_TOKEN', '')
+            object.__setattr__(self, 'webhook', WebhookConfig(
+                url=self._get_env('WEBHOOK_URL', ''),
+                path=self._get_env('WEBHOOK_PATH', '/webhook'),
+                host=self._get_env('WEBHOOK_HOST', '0.0.0.0'),
+                port=int(self._get_env('WEBHOOK_PORT', '443')),
+                secret_token=SecretStr(secret_token) if secret_token else None,
+                ssl_cert=self._get_env('WEBHOOK_SSL_CERT', '') or None,
+                ssl_key=self._get_env('WEBHOOK_SSL_KEY', '') or None,
             ))
 
+        if self.bot_mode == 'webhook' and not self.webhook.url:
+            raise ValueError('WEBHOOK_URL is required in webhook mode')
+
+        # без секрета любой, кто знает адрес, может слать боту поддельные апдейты
+        if self.bot_mode == 'webhook' and not self.webhook.secret_token:
+            raise ValueError('WEBHOOK_SECRET_TOKEN is required in webhook mode')
+
+        if self.bot_role == 'worker':
+            _ = self.worker_shards
+
     @staticmethod
     def _get_env(key: str, default: str = '') -> str:
         """Безопасное получение строки из окружения"""
@@ -257,6 +532,7 @@ class AppConfig(BaseSettings):
 
         if data.get('database'):
             data['database']['password'] = '********'
+            data['database']['replica_dsns'] = ['********'] * len(self.database.replica_dsns)
             if hasattr(self, 'database') and self.database:
                 data['database']['url'] = self.database.safe_url
 
@@ -265,6 +541,9 @@ class AppConfig(BaseSettings):
             if hasattr(self, 'redis') and self.redis:
                 data['redis']['url'] = self.redis.safe_url
 
+        if data.get('webhook'):
+            data['webhook']['secret_token'] = '********' if self.webhook and self.webhook.secret_token else None
+
         return data
 
     def __repr__(self) -> str:
@@ -1,24 +1,46 @@
+import asyncio
+import json
 import logging
+import ssl
 
 from dataclasses import dataclass
+from typing import AsyncContextManager, AsyncIterator, Optional, Protocol, Tuple
 
-from aiogram import Bot, Dispatcher, Router
+from aiogram import BaseMiddleware, Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.telegram import TelegramAPIServer, PRODUCTION
 from aiogram.enums import ParseMode
+from aiogram.fsm.storage.redis import RedisStorage, DefaultKeyBuilder
+from aiogram.methods import TelegramMethod
+from aiogram.types import FSInputFile, Update
 from aiogram.utils.callback_answer import CallbackAnswerMiddleware
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from redis.exceptions import RedisError
 
 from dummy_bot.config.config import AppConfig
 
+from dummy_bot.internal.app.chat_dispatcher import ChatDispatcher
+from dummy_bot.internal.app.gateway import UpdateGateway, update_chat_id
 from dummy_bot.internal.database.postgres.client import PostgresClient
 from dummy_bot.internal.database.redis.client import RedisClient
+from dummy_bot.internal.database.redis.update_stream import ShardLeaseLost, UpdateStream
 from dummy_bot.internal.database.transactional.uow import UOW
-from dummy_bot.internal.logger.logger import Logger, JSONCustomFormatter
+from dummy_bot.internal.logger.logger import Logger, JSONCustomFormatter, json_dumps, fast_json_dumps, json_encoder_name
 from dummy_bot.internal.middleware.admins_mw import AdminsMiddleware
 from dummy_bot.internal.middleware.session_mw import DBSessionMiddleware
+from dummy_bot.internal.middleware.telegram_mw import (
+    TelegramMetricsMiddleware,
+    TelegramTracingMiddleware,
+    RateLimitMiddleware,
+)
+from dummy_bot.internal.middleware.tracing_mw import UpdateTracingMiddleware, TracedMiddleware
 from dummy_bot.internal.presentation.commands import CommandsRouter
+from dummy_bot.internal.presentation.members import MembersRouter
 from dummy_bot.internal.presentation.states import StatesRouter
 from dummy_bot.internal.presentation.text import TextRouter
 from dummy_bot.internal.repository.group import GroupRepository
+from dummy_bot.internal.repository.leaderboard import LeaderboardRepository
 from dummy_bot.internal.repository.media import MediaRepository
 from dummy_bot.internal.repository.pokak import PokakRepository
 from dummy_bot.internal.repository.statistics import StatisticsRepository
@@ -27,12 +49,33 @@ from dummy_bot.internal.usecase.commands import CommandsUseCase
 from dummy_bot.internal.usecase.media import MediaUseCase
 from dummy_bot.internal.usecase.mute import MuteUseCase
 from dummy_bot.internal.usecase.pokak import PokakUseCase
+from dummy_bot.internal.usecase.pokak_batch import PokakBatchWriter
 from dummy_bot.internal.usecase.statistics import StatisticsUseCase
+from dummy_bot.internal.utils.bot_session import TunedAiohttpSession, connection_reuse_ratio
+from dummy_bot.internal.utils.lookup_cache import LookupCache
+from dummy_bot.internal.utils.metrics import REGISTRY, GaugeCallback
+from dummy_bot.internal.utils.outbound import OutboundScheduler
+from dummy_bot.internal.utils.tracing import TRACER, InMemorySpanExporter, FileSpanExporter
+from dummy_bot.internal.utils.report_cache import ReportCache
+
+
+class IUpdateStream(Protocol):
+    async def publish(self, shard: int, payload: str) -> None: ...
+
+    def lease(self, shard: int) -> AsyncContextManager[None]: ...
+
+    def read(self, shard: int) -> AsyncIterator[Tuple[str, str]]: ...
+
+    async def ack(self, shard: int, entry_id: str) -> None: ...
 
 
 class App:
-    def __init__(self, cfg: AppConfig):
+    def __init__(self, cfg: AppConfig, update_stream: Optional[IUpdateStream] = None):
         self.cfg = cfg
+        # очередь апдейтов gateway -> worker; по умолчанию redis streams
+        self.update_stream = update_stream
+        self.gateway = None
+        self.metrics_runner = None
         self.logger = None
         self.database = None
         self.cache = None
@@ -49,6 +92,7 @@ class App:
         logging.info("app configuring...")
 
         self._init_logger()
+        self._init_tracing()
         self._init_database()
         self._init_cache()
         self._init_bot()
@@ -58,31 +102,76 @@ class App:
         self._init_uow()
         self._init_use_cases()
         self._init_services()
+        self._init_metrics()
 
         logging.info("app configured successfully")
 
     def _init_logger(self):
+        dumps = fast_json_dumps if self.cfg.log_fast_json else json_dumps
         self.logger = Logger(
             level=logging.INFO,
-            formatter=JSONCustomFormatter(),
+            formatter=JSONCustomFormatter(dumps=dumps),
+            queue_size=self.cfg.log_queue_size,
         )
 
+        encoder = json_encoder_name(dumps)
+        if self.cfg.log_fast_json and encoder != "orjson":
+            logging.warning("LOG_FAST_JSON is on, but orjson is not installed (extra fast-json): logs use json")
+        logging.info(f"log JSON encoder: {encoder}")
+
+    def _init_tracing(self):
+        exporter = None
+        if self.cfg.tracing_exporter == "memory":
+            exporter = InMemorySpanExporter()
+        elif self.cfg.tracing_exporter == "file":
+            exporter = FileSpanExporter(self.cfg.tracing_file)
+        TRACER.configure(exporter, sample_rate=self.cfg.tracing_sample_rate)
+
+    def _traced(self, middleware: BaseMiddleware) -> BaseMiddleware:
+        return TracedMiddleware(middleware) if TRACER.enabled else middleware
+
     def _init_bot(self):
+        tg = self.cfg.telegram
+        # одна сессия на процесс: соединения к api.telegram.org переиспользуются между запросами
+        session = TunedAiohttpSession(
+            limit=tg.connection_limit,
+            keepalive_timeout=tg.keepalive_timeout,
+            dns_cache_ttl=tg.dns_cache_ttl,
+            connect_timeout=tg.connect_timeout,
+            timeout=tg.request_timeout,
+            api=TelegramAPIServer.from_base(tg.api_url) if tg.api_url else PRODUCTION,
+        )
         self.bot = Bot(
-            token=self.cfg.telegram.get_token,
+            token=tg.get_token,
+            session=session,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML),
         )
+        self.outbound = OutboundScheduler(
+            global_rate=self.cfg.outbound_global_rate,
+            group_rate=self.cfg.outbound_group_rate_per_minute / 60,
+            chat_burst=self.cfg.outbound_chat_burst,
+        )
+        # первый - внешний: ожидание лимита не попадает в метрики и спаны самого запроса
+        self.bot.session.middleware(RateLimitMiddleware(self.outbound))
+        self.bot.session.middleware(TelegramMetricsMiddleware())
+        if TRACER.enabled:
+            self.bot.session.middleware(TelegramTracingMiddleware())
 
     def _init_database(self):
         self.database = PostgresClient(cfg=self.cfg.database)
 
     def _init_cache(self):
         self.cache = RedisClient(cfg=self.cfg.redis)
+        self.lookup_cache = LookupCache()
+        self.report_cache = ReportCache()
+        if self.update_stream is None:
+            self.update_stream = UpdateStream(cache=self.cache, maxlen=self.cfg.updates_stream_maxlen)
 
     def _init_router(self):
         self.router = Router()
         self.admin_router = Router()
-        self.admin_router.message.middleware(AdminsMiddleware(cache=self.cache))
+        self.admins_mw = AdminsMiddleware(cache=self.cache, long_ttl=self.cfg.admins_cache_ttl)
+        self.admin_router.message.middleware(self._traced(self.admins_mw))
 
     def _init_repositories(self):
         self.repositories = Repositories(
@@ -91,28 +180,47 @@ class App:
             media=MediaRepository(),
             pokak=PokakRepository(),
             statistics=StatisticsRepository(),
+            leaderboard=LeaderboardRepository(cache=self.cache),
         )
 
     def _init_uow(self):
         self.uow = UOW()
 
     def _init_use_cases(self):
+        self.pokak_writer = None
+        if self.cfg.pokak_write_behind:
+            self.pokak_writer = PokakBatchWriter(
+                session_pool=self.database.get_sessionmaker(),
+                pokak_repo=self.repositories.pokak,
+                leaderboard_repo=self.repositories.leaderboard,
+                report_cache=self.report_cache,
+                uow=self.uow,
+                batch_size=self.cfg.pokak_batch_size,
+                flush_interval=self.cfg.pokak_flush_interval_ms / 1000,
+            )
+
         self.uc = UseCases(
             commands=CommandsUseCase(
                 group_repo=self.repositories.group,
                 user_repo=self.repositories.user,
+                leaderboard_repo=self.repositories.leaderboard,
+                lookup_cache=self.lookup_cache,
+                report_cache=self.report_cache,
                 uow=self.uow,
             ),
 
             statistics=StatisticsUseCase(
                 group_repo=self.repositories.group,
                 stat_repo=self.repositories.statistics,
+                leaderboard_repo=self.repositories.leaderboard,
                 uow=self.uow,
+                read_session_pool=self.database.get_read_sessionmaker() if self.database.has_replicas else None,
             ),
 
             media=MediaUseCase(
                 group_repo=self.repositories.group,
                 media_repo=self.repositories.media,
+                lookup_cache=self.lookup_cache,
                 uow=self.uow,
             ),
 
@@ -121,7 +229,11 @@ class App:
                 group_repo=self.repositories.group,
                 media_repo=self.repositories.media,
                 pokak_repo=self.repositories.pokak,
+                leaderboard_repo=self.repositories.leaderboard,
+                lookup_cache=self.lookup_cache,
+                report_cache=self.report_cache,
                 uow=self.uow,
+                batch_writer=self.pokak_writer,
             ),
             mute=MuteUseCase(self.logger),
         )
@@ -134,6 +246,7 @@ class App:
                 logger=self.logger,
                 commands_use_case=self.uc.commands,
                 stat_use_case=self.uc.statistics,
+                report_cache=self.report_cache,
             ),
             states=StatesRouter(
                 router=self.router,
@@ -147,14 +260,84 @@ class App:
                 logger=self.logger,
                 pokak_use_case=self.uc.pokak,
                 mute_use_case=self.uc.mute,
+                sender=self.outbound,
+                success_log_sample_rate=self.cfg.log_text_success_sample_rate,
+            ),
+            members=MembersRouter(
+                router=self.router,
+                logger=self.logger,
+                admins_cache=self.admins_mw,
             ),
         )
 
-    def _init_dispatcher(self):
-        self.dp = Dispatcher()
+    def _init_metrics(self):
+        REGISTRY.register(GaugeCallback(
+            "bot_db_pool", "Primary database pool state", ("stat",),
+            lambda: {(name,): value for name, value in self.database.pool_stats().items()},
+        ))
+        REGISTRY.register(GaugeCallback(
+            "bot_local_cache", "In-process cache size and hit/miss counters", ("cache", "stat"),
+            lambda: {
+                (cache, name): value
+                for cache, stats in {**self.lookup_cache.stats(), "reports": self.report_cache.stats()}.items()
+                for name, value in stats.items()
+            },
+        ))
+        REGISTRY.register(GaugeCallback(
+            "bot_outbound_dropped", "Background Telegram requests dropped on overflow", (),
+            lambda: {(): self.outbound.dropped},
+        ))
+        REGISTRY.register(GaugeCallback(
+            "bot_http_connection_reuse_ratio", "Share of Bot API requests sent over a kept-alive connection", (),
+            lambda: {(): connection_reuse_ratio()},
+        ))
+        REGISTRY.register(GaugeCallback(
+            "bot_log_dropped", "Log records dropped on a full logging queue", (),
+            lambda: {(): self.logger.dropped},
+        ))
+        if self.pokak_writer:
+            REGISTRY.register(GaugeCallback(
+                "bot_pokak_writer", "Write-behind pokak writer counters", ("stat",),
+                lambda: {("written",): self.pokak_writer.written, ("dropped",): self.pokak_writer.dropped},
+            ))
+
+    async def _run_metrics_server(self):
+        async def metrics(_: web.Request) -> web.Response:
+            return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8",
+                                headers={"X-Content-Type-Options": "nosniff"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+
+        self.metrics_runner = web.AppRunner(app, access_log=None)
+        await self.metrics_runner.setup()
+        await web.TCPSite(self.metrics_runner, host=self.cfg.metrics_host, port=self.cfg.metrics_port).start()
+        logging.info(f"start metrics server on {self.cfg.metrics_host}:{self.cfg.metrics_port}/metrics...")
 
-        self.dp.update.middleware(
-            DBSessionMiddleware(session_pool=self.database.get_sessionmaker()),
+    def _init_dispatcher(self):
+        # FSM в redis: состояние переживает рестарт и общее для всех реплик бота,
+        # брошенные диалоги удаляются по TTL
+        self.dp = Dispatcher(storage=RedisStorage(
+            redis=self.cache.client,
+            key_builder=DefaultKeyBuilder(prefix="fsm"),
+            state_ttl=self.cfg.redis.fsm_ttl,
+            data_ttl=self.cfg.redis.fsm_ttl,
+        ))
+
+        if TRACER.enabled:
+            self.dp.update.outer_middleware(UpdateTracingMiddleware())
+
+        # gateway не обрабатывает апдейты диспетчером, а пересылает их в шарды как есть
+        if self.cfg.bot_role == "gateway":
+            self.gateway = UpdateGateway(
+                stream=self.update_stream,
+                shards=self.cfg.bot_shards,
+                bot=self.bot,
+                secret_token=self.cfg.webhook.get_secret_token,
+            )
+
+        self.dp.message.middleware(
+            self._traced(DBSessionMiddleware(session_pool=self.database.get_sessionmaker())),
         )
 
         self.dp.callback_query.middleware(
@@ -164,17 +347,149 @@ class App:
         self.dp.include_router(self.admin_router)
         self.dp.include_router(self.router)
 
+        self.dp.shutdown.register(self.shutdown)
+
     async def run(self):
-        await self.database.ping()
         await self.cache.ping()
+
+        if self.cfg.metrics_port:
+            await self._run_metrics_server()
+
+        # gateway только раскладывает апдейты по шардам, база ему не нужна
+        if self.cfg.bot_role != "gateway":
+            await self.database.ping()
+
+            if self.database.has_replicas:
+                self.dp.startup.register(self.database.start_health_check)
+            if self.pokak_writer:
+                self.dp.startup.register(self.pokak_writer.start)
+
+        if self.cfg.bot_role == "worker":
+            await self._run_worker()
+            return
+
+        if self.cfg.bot_mode == "webhook":
+            await self._run_webhook()
+            return
+
+        if self.gateway:
+            await self._run_polling_gateway()
+            return
+
         logging.info("start polling...")
+        await self.bot.delete_webhook()
         await self.dp.start_polling(self.bot)
 
+    async def _run_polling_gateway(self):
+        await self.dp.emit_startup(bot=self.bot)
+        logging.info("start polling gateway...")
+        try:
+            await self.bot.delete_webhook()
+            # апдейты публикуются строго по очереди, чтобы не перемешать порядок внутри чата
+            await self.gateway.poll(allowed_updates=self.dp.resolve_used_update_types())
+        finally:
+            await self.dp.emit_shutdown(bot=self.bot)
+            await self.bot.session.close()
+
+    async def _run_worker(self):
+        shards = self.cfg.worker_shards
+
+        await self.dp.emit_startup(bot=self.bot)
+        logging.info(f"start worker for shards {shards}...")
+        try:
+            await asyncio.gather(*(self._consume_shard(shard) for shard in shards))
+        finally:
+            await self.dp.emit_shutdown(bot=self.bot)
+            await self.bot.session.close()
+
+    async def _consume_shard(self, shard: int):
+        while True:
+            try:
+                async with self.update_stream.lease(shard):
+                    await self._consume_leased_shard(shard)
+                # очередь закрыта gateway
+                return
+            except (RedisError, ShardLeaseLost) as e:
+                logging.warning(f"failed read updates shard {shard}: {e.__repr__()}")
+                await asyncio.sleep(1)
+
+    async def _consume_leased_shard(self, shard: int):
+        async def process(entry_id: str, payload: str):
+            await self._process_update(payload)
+            await self.update_stream.ack(shard, entry_id)
+
+        chats = ChatDispatcher(process)
+        try:
+            async for entry_id, payload in self.update_stream.read(shard):
+                await chats.dispatch(update_chat_id(json.loads(payload)), entry_id, payload)
+            await chats.join()
+        except RedisError:
+            # аренда ещё продлевается: прочитанное дообрабатываем, иначе его повторит следующее чтение
+            await chats.join()
+            raise
+        finally:
+            # аренда потеряна или воркер остановлен: апдейты в работе достанутся следующему владельцу
+            await chats.cancel()
+
+    async def _process_update(self, payload: str):
+        update = Update.model_validate_json(payload, context={"bot": self.bot})
+        try:
+            result = await self.dp.feed_update(self.bot, update)
+            if isinstance(result, TelegramMethod):
+                await self.bot(result)
+        except Exception as e:
+            logging.exception(f"failed process update {update.update_id}: {e.__repr__()}")
+
+    async def _run_webhook(self):
+        cfg = self.cfg.webhook
+
+        self.dp.startup.register(self._set_webhook)
+
+        app = web.Application()
+        if self.gateway:
+            app.router.add_post(cfg.path, self.gateway.handle_webhook)
+        else:
+            SimpleRequestHandler(
+                dispatcher=self.dp,
+                bot=self.bot,
+                secret_token=cfg.get_secret_token,
+            ).register(app, path=cfg.path)
+        setup_application(app, self.dp, bot=self.bot)
+
+        ssl_context = None
+        if cfg.ssl_cert and cfg.ssl_key:
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(cfg.ssl_cert, cfg.ssl_key)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host=cfg.host, port=cfg.port, ssl_context=ssl_context).start()
+            logging.info(f"start webhook server on {cfg.host}:{cfg.port}{cfg.path}...")
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    async def _set_webhook(self):
+        cfg = self.cfg.webhook
+        await self.bot.set_webhook(
+            url=cfg.full_url,
+            secret_token=cfg.get_secret_token,
+            certificate=FSInputFile(cfg.ssl_cert) if cfg.ssl_cert else None,
+            allowed_updates=self.dp.resolve_used_update_types(),
+        )
+
     async def shutdown(self):
-        await self.dp.shutdown()
-        await self.router.shutdown()
+        logging.info(f"app shutting down, database pool: {self.database.pool_stats()}")
+        if self.pokak_writer:
+            await self.pokak_writer.stop()
+        await self.outbound.drain()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
         await self.cache.shutdown()
         await self.database.shutdown()
+        TRACER.shutdown()
+        self.logger.stop()
 
 
 @dataclass
@@ -184,6 +499,7 @@ class Repositories:
     media: MediaRepository
     pokak: PokakRepository
     statistics: StatisticsRepository
+    leaderboard: LeaderboardRepository
 
 @dataclass
 class UseCases:
@@ -198,3 +514,4 @@ class Routers:
     commands: CommandsRouter
     states: StatesRouter
     text: TextRouter
+    members: MembersRouter
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+
+class ChatDispatcher:
+    """
+    Обработка апдейтов шарда: по очереди внутри чата, параллельно между чатами.
+    Долгое ожидание лимита Bot API в одном чате не задерживает остальные чаты шарда
+    """
+
+    def __init__(self, process: Callable[[str, str], Awaitable[None]], max_inflight: int = 1000) -> None:
+        self._process = process
+        # не больше max_inflight прочитанных и не обработанных апдейтов: дальше чтение ждёт
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._queues: Dict[Optional[int], Deque[Tuple[str, str]]] = {}
+        self._workers: Set[asyncio.Task] = set()
+
+    async def dispatch(self, chat_id: Optional[int], entry_id: str, payload: str) -> None:
+        await self._slots.acquire()
+
+        queue = self._queues.get(chat_id)
+        if queue is not None:
+            queue.append((entry_id, payload))
+            return
+
+        self._queues[chat_id] = deque([(entry_id, payload)])
+        worker = asyncio.create_task(self._drain(chat_id))
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+    async def join(self) -> None:
+        """Дожидается обработки всех уже прочитанных апдейтов"""
+        while self._workers:
+            await asyncio.gather(*self._workers)
+
+    async def cancel(self) -> None:
+        """Прерывает обработку: неподтверждённые апдейты перечитает следующий владелец шарда"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def _drain(self, chat_id: Optional[int]) -> None:
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                entry_id, payload = queue[0]
+                try:
+                    await self._process(entry_id, payload)
+                except Exception as e:
+                    logging.warning(f"failed process update {entry_id} of chat {chat_id}: {e.__repr__()}")
+                queue.popleft()
+                self._slots.release()
+        finally:
+            del self._queues[chat_id]
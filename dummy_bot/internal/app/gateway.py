@@ -0,0 +1,107 @@
+import asyncio
+import hmac
+import json
+import logging
+from typing import Any, Dict, List, Optional, Protocol
+
+from aiogram import Bot
+from aiohttp import ClientError, ClientTimeout, web
+
+from dummy_bot.internal.utils.sharding import shard_for
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class IUpdateStream(Protocol):
+    async def publish(self, shard: int, payload: str) -> None: ...
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """
+    Chat id апдейта без разбора в модели aiogram: чат события или,
+    для callback_query, чат сообщения с кнопкой
+    """
+    for event_type, event in update.items():
+        if event_type == "update_id" or not isinstance(event, dict):
+            continue
+
+        chat = event.get("chat") or (event.get("message") or {}).get("chat")
+        return chat.get("id") if chat else None
+    return None
+
+
+class UpdateGateway:
+    """
+    Роль gateway: пересылает апдейты в шарды как есть, без валидации pydantic и обратной
+    сериализации - из тела webhook-запроса или из ответа getUpdates читается только chat id
+    """
+
+    def __init__(self, stream: IUpdateStream, shards: int, bot: Bot, secret_token: Optional[str] = None) -> None:
+        self._stream = stream
+        self._shards = shards
+        self._bot = bot
+        self._secret_token = secret_token
+
+    async def publish(self, payload: str, update: Dict[str, Any]) -> None:
+        chat_id = update_chat_id(update)
+        await self._stream.publish(shard_for(chat_id, self._shards) if chat_id is not None else 0, payload)
+
+    async def handle_webhook(self, request: web.Request) -> web.Response:
+        if self._secret_token and not hmac.compare_digest(
+                request.headers.get(SECRET_HEADER, ""), self._secret_token,
+        ):
+            return web.Response(status=401)
+
+        body = await request.read()
+        try:
+            update = json.loads(body)
+        except ValueError:
+            return web.Response(status=400)
+
+        # ответ только после публикации: при ошибке Telegram повторит апдейт
+        await self.publish(body.decode(), update)
+        return web.Response()
+
+    async def poll(self, allowed_updates: List[str], timeout: int = 30) -> None:
+        """
+        Long polling сырых апдейтов. offset сдвигается только после публикации апдейта:
+        упавшая публикация повторяется, а не теряется
+        """
+        offset = None
+        while True:
+            try:
+                updates = await self._get_updates(offset, allowed_updates, timeout)
+            except (ClientError, asyncio.TimeoutError, ValueError) as e:
+                logging.warning(f"failed get updates: {e.__repr__()}")
+                await asyncio.sleep(1)
+                continue
+
+            for update in updates:
+                await self._publish_with_retry(update)
+                offset = update["update_id"] + 1
+
+    async def _publish_with_retry(self, update: Dict[str, Any]) -> None:
+        payload = json.dumps(update, ensure_ascii=False, separators=(",", ":"))
+        delay = 0.1
+        while True:
+            try:
+                await self.publish(payload, update)
+                return
+            except Exception as e:
+                logging.warning(f"failed publish update {update.get('update_id')}: {e.__repr__()}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+
+    async def _get_updates(self, offset: Optional[int], allowed_updates: List[str], timeout: int) -> List[Dict[str, Any]]:
+        session = await self._bot.session.create_session()
+        url = self._bot.session.api.api_url(token=self._bot.token, method="getUpdates")
+        params = {"timeout": timeout, "allowed_updates": allowed_updates}
+        if offset is not None:
+            params["offset"] = offset
+
+        async with session.post(url, json=params, timeout=ClientTimeout(total=timeout + 10)) as response:
+            body = await response.json(content_type=None)
+
+        if not body.get("ok"):
+            raise ValueError(f"getUpdates failed: {body.get('error_code')} {body.get('description')}")
+        return body["result"]
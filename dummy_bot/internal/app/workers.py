@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import multiprocessing as mp
+import queue
+import sys
+from multiprocessing.context import SpawnProcess
+from typing import AsyncIterator, List, Tuple
+
+from dummy_bot.config.config import AppConfig
+from dummy_bot.internal.app.app import App
+
+_STOP = None
+
+
+class LocalUpdateStream:
+    """
+    Очередь апдейтов между процессами одной машины: по multiprocessing.Queue на шард.
+    Gateway пишет в очередь шарда, воркер-процесс читает только свою
+    """
+
+    def __init__(self, queues: List[mp.Queue], read_batch: int = 100) -> None:
+        self._queues = queues
+        self._read_batch = read_batch
+
+    async def publish(self, shard: int, payload: str) -> None:
+        q = self._queues[shard]
+        try:
+            q.put_nowait(payload)
+        except queue.Full:
+            # воркер не успевает: ждём место в треде, не блокируя цикл gateway
+            await asyncio.get_running_loop().run_in_executor(None, q.put, payload)
+
+    async def read(self, shard: int) -> AsyncIterator[Tuple[str, str]]:
+        loop = asyncio.get_running_loop()
+        q = self._queues[shard]
+        n = 0
+        while True:
+            for payload in await loop.run_in_executor(None, self._get_batch, q):
+                if payload is _STOP:
+                    return
+                n += 1
+                yield str(n), payload
+
+    async def ack(self, shard: int, entry_id: str) -> None:
+        # доставка в пределах машины: подтверждать нечего
+        pass
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        for q in self._queues:
+            await loop.run_in_executor(None, q.put, _STOP)
+
+    def _get_batch(self, q: mp.Queue) -> List[str]:
+        # короткий таймаут, чтобы поток executor'а не висел при остановке
+        try:
+            batch = [q.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        while len(batch) < self._read_batch and batch[-1] is not _STOP:
+            try:
+                batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+
+def _run_worker(cfg: AppConfig, queues: List[mp.Queue]) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout,
+    )
+    try:
+        asyncio.run(App(cfg, update_stream=LocalUpdateStream(queues)).run())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_with_workers(cfg: AppConfig, workers: int, queue_size: int = 10_000) -> None:
+    """
+    Gateway в текущем процессе и workers процессов с собственными App,
+    пулами БД и redis; апдейты раскладываются по процессам по chat id
+    """
+    ctx = mp.get_context("spawn")
+    queues = [ctx.Queue(maxsize=queue_size) for _ in range(workers)]
+
+    processes: List[SpawnProcess] = []
+    for shard in range(workers):
+        worker_cfg = cfg.model_copy(update={
+            "bot_role": "worker",
+            "bot_shards": workers,
+            "bot_worker_shards": str(shard),
+            # у каждого воркера свой порт метрик, следом за портом gateway
+            "metrics_port": cfg.metrics_port + 1 + shard if cfg.metrics_port else 0,
+        })
+        process = ctx.Process(target=_run_worker, args=(worker_cfg, queues), name=f"worker-{shard}", daemon=False)
+        process.start()
+        processes.append(process)
+
+    gateway_cfg = cfg.model_copy(update={"bot_role": "gateway", "bot_shards": workers})
+    stream = LocalUpdateStream(queues)
+
+    async def run_gateway() -> None:
+        try:
+            await App(gateway_cfg, update_stream=stream).run()
+        finally:
+            await stream.close()
+
+    try:
+        asyncio.run(run_gateway())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                logging.warning(f"{process.name} did not stop, terminating")
+                process.terminate()
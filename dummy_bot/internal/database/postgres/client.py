@@ -1,13 +1,90 @@
-from typing import Optional
+import asyncio
+import itertools
+import logging
+import time
+from typing import Optional, Dict, List
 
-from sqlalchemy import text
+from sqlalchemy import text, event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     create_async_engine,
 )
 from sqlalchemy.ext.asyncio.session import async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from dummy_bot.config.config import DatabaseConfig
+from dummy_bot.internal.utils.metrics import DB_QUERY_DURATION
+from dummy_bot.internal.utils.tracing import TRACER
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, считающий время получения соединения (ожидание в очереди и подключение)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkouts, pool.wait_total, pool.wait_max = self.checkouts, self.wait_total, self.wait_max
+        return pool
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Время выполнения запросов в гистограмму bot_db_query_duration_seconds и спан на каждый запрос"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_started_at = time.perf_counter()
+        context.query_span = TRACER.start_span("sql", engine=name, statement=statement[:500])
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERY_DURATION.observe(time.perf_counter() - context.query_started_at, name)
+        TRACER.end_span(context.query_span)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        if context is not None:
+            TRACER.end_span(getattr(context, "query_span", None), exception_context.original_exception)
+
+
+class ReadSessionmaker:
+    """
+    Фабрика сессий для чтения: по кругу отдаёт сессии здоровых реплик,
+    а если здоровых нет - сессию primary
+    """
+
+    def __init__(self, primary: async_sessionmaker, replicas: List[async_sessionmaker]) -> None:
+        self._primary = primary
+        self._replicas = replicas
+        self._healthy: List[bool] = [True] * len(replicas)
+        self._next = itertools.count()
+
+    def __call__(self) -> AsyncSession:
+        healthy = [pool for pool, ok in zip(self._replicas, self._healthy) if ok]
+        if not healthy:
+            return self._primary()
+        return healthy[next(self._next) % len(healthy)]()
+
+    def set_healthy(self, index: int, healthy: bool) -> bool:
+        """Обновляет состояние реплики, возвращает True, если оно изменилось"""
+        changed = self._healthy[index] != healthy
+        self._healthy[index] = healthy
+        return changed
 
 
 class PostgresClient:
@@ -15,27 +92,110 @@ class PostgresClient:
         self.__cfg: DatabaseConfig = cfg
         self.__engine: Optional[AsyncEngine] = None
         self.__sessionmaker: Optional[async_sessionmaker] = None
+        self.__replica_engines: List[AsyncEngine] = []
+        self.__read_sessionmaker: Optional[ReadSessionmaker] = None
+        self.__health_task: Optional[asyncio.Task] = None
         self.__register_engine()
 
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self.__replica_engines)
+
     def get_sessionmaker(self) -> async_sessionmaker:
         if self.__sessionmaker is None:
-            self.__sessionmaker = async_sessionmaker(
-                bind=self.__engine,
-                class_=AsyncSession,
-                expire_on_commit=False,
-                autobegin=False,
-            )
+            self.__sessionmaker = self.__make_sessionmaker(self.__engine)
         return self.__sessionmaker
 
+    def get_read_sessionmaker(self) -> ReadSessionmaker:
+        if self.__read_sessionmaker is None:
+            self.__read_sessionmaker = ReadSessionmaker(
+                primary=self.get_sessionmaker(),
+                replicas=[self.__make_sessionmaker(engine) for engine in self.__replica_engines],
+            )
+        return self.__read_sessionmaker
+
+    @staticmethod
+    def __make_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(
+            bind=engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autobegin=False,
+        )
+
     def __register_engine(self) -> None:
         if self.__engine is None:
             self.__engine = create_async_engine(
                 url=self.__cfg.dsn,
+                poolclass=TimedQueuePool,
+                **self.__cfg.engine_kwargs,
                 # echo=True,
             )
+            self.__replica_engines = [
+                create_async_engine(url=url, poolclass=TimedQueuePool, **self.__cfg.engine_kwargs)
+                for url in self.__cfg.replica_urls
+            ]
+
+            instrument_engine(self.__engine, "primary")
+            for engine in self.__replica_engines:
+                instrument_engine(engine, "replica")
+
+    def pool_stats(self) -> Dict[str, float]:
+        pool: TimedQueuePool = self.__engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": self.__cfg.max_overflow,
+            "checkouts": pool.checkouts,
+            "wait_total_seconds": pool.wait_total,
+            "wait_max_seconds": pool.wait_max,
+        }
 
     async def ping(self):
         async with self.__engine.connect() as conn:
             await conn.execute(text("SELECT 1"))
 
+    async def start_health_check(self) -> None:
+        """Запускает фоновую проверку реплик; упавшая реплика исключается из чтения до восстановления"""
+        if self.__replica_engines and self.__health_task is None:
+            await self.__check_replicas()
+            self.__health_task = asyncio.create_task(self.__health_loop())
+
+    async def __health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.__cfg.replica_check_interval)
+            await self.__check_replicas()
+
+    async def __check_replicas(self) -> None:
+        read_sessionmaker = self.get_read_sessionmaker()
+        for i, engine in enumerate(self.__replica_engines):
+            error = None
+            try:
+                async with asyncio.timeout(self.__cfg.replica_check_interval):
+                    async with engine.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+            except Exception as e:
+                error = e
+
+            if read_sessionmaker.set_healthy(i, error is None):
+                if error is None:
+                    logging.info(f"replica {engine.url.render_as_string()} is back")
+                else:
+                    logging.warning(f"replica {engine.url.render_as_string()} is unavailable: {error.__repr__()}")
+
+    async def shutdown(self):
+        if self.__health_task is not None:
+            self.__health_task.cancel()
+            try:
+                await self.__health_task
+            except asyncio.CancelledError:
+                pass
+            self.__health_task = None
+
+        for engine in self.__replica_engines:
+            await engine.dispose()
+        if self.__engine is not None:
+            await self.__engine.dispose()
 
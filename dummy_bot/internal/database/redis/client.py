@@ -1,35 +1,70 @@
+import time
 from typing import Optional
 
 from dummy_bot.config.config import RedisConfig
-from redis import Redis
+from dummy_bot.internal.utils.metrics import REDIS_COMMAND_DURATION
+from redis.asyncio import Redis, BlockingConnectionPool
+
+
+class TimedRedis(Redis):
+    """Время команд в гистограмму bot_redis_command_duration_seconds (без пайплайнов)"""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.observe(time.perf_counter() - start, str(args[0]).upper())
 
 
 class RedisClient:
     def __init__(self, cfg: RedisConfig):
         self.__config = cfg
-        self.__client = None
+        self.__pool: Optional[BlockingConnectionPool] = None
+        self.__client: Optional[Redis] = None
 
     @property
     def client(self) -> Redis:
         if self.__client is None:
-            self.__client = Redis(**self.__config.connection_kwargs)
+            self.__client = TimedRedis(connection_pool=self.pool)
         return self.__client
 
+    @property
+    def pool(self) -> BlockingConnectionPool:
+        if self.__pool is None:
+            # при занятом пуле команда ждёт свободное соединение, а не падает с "Too many connections"
+            self.__pool = BlockingConnectionPool.from_url(
+                self.__config.url,
+                max_connections=self.__config.max_connections,
+                timeout=self.__config.socket_timeout,
+                socket_timeout=self.__config.socket_timeout,
+                socket_connect_timeout=self.__config.socket_connect_timeout,
+                retry_on_timeout=self.__config.retry_on_timeout,
+                decode_responses=self.__config.decode_responses,
+                health_check_interval=self.__config.health_check_interval,
+            )
+        return self.__pool
+
+    def key(self, key: str) -> str:
+        """Ключ с префиксом базы - для команд, отправляемых напрямую через client"""
+        return f"{self.__config.db}:{key}"
+
     async def get(self, key: str):
-        return self.client.get(
-            f"{self.__config.connection_kwargs.get(self.__config.db, 0)}:{key}",
-        )
+        return await self.client.get(self.key(key))
 
     async def set(self, key: str, value: str, expire: Optional[int] = None):
-        return self.client.set(
-            f"{self.__config.connection_kwargs.get(self.__config.db, 0)}:{key}",
-            value, ex=expire,
-        )
+        return await self.client.set(self.key(key), value, ex=expire)
+
+    async def delete(self, key: str):
+        return await self.client.delete(self.key(key))
 
     async def ping(self):
-        return self.client.ping()
+        return await self.client.ping()
 
-    def close(self):
+    async def shutdown(self):
         if self.__client:
-            self.__client.close()
+            await self.__client.aclose()
             self.__client = None
+        if self.__pool:
+            await self.__pool.disconnect()
+            self.__pool = None
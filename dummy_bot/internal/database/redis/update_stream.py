@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import os
+import socket
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Protocol, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+
+class IRedisClient(Protocol):
+    @property
+    def client(self) -> Redis: ...
+
+    def key(self, key: str) -> str: ...
+
+
+class ShardLeaseLost(Exception):
+    """Аренду шарда забрал другой воркер: этот перестаёт читать шард"""
+
+
+# продление и освобождение аренды только её владельцем
+_RENEW_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class UpdateStream:
+    """
+    Очередь апдейтов на redis streams: по стриму на шард.
+    Шард читает и обрабатывает только владелец аренды, поэтому порядок апдейтов внутри чата
+    сохраняется, даже если один шард по ошибке назначен нескольким воркерам
+    """
+
+    def __init__(self, cache: IRedisClient, maxlen: int = 100_000, group: str = "workers",
+                 consumer: str | None = None, lease_ms: int = 30_000) -> None:
+        self.__cache = cache
+        self.__maxlen = maxlen
+        self.__group = group
+        # имя consumer'а и владельца аренды - своё у каждого процесса
+        self.__consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.__lease_ms = lease_ms
+
+    async def publish(self, shard: int, payload: str) -> None:
+        await self.__cache.client.xadd(
+            self._key(shard), {"update": payload}, maxlen=self.__maxlen, approximate=True,
+        )
+
+    @asynccontextmanager
+    async def lease(self, shard: int) -> AsyncIterator[None]:
+        """
+        Аренда шарда на всё время чтения и обработки его апдейтов: ждёт освобождения,
+        продлевает в фоне, сколько бы ни длилась обработка. Если аренду забрал другой воркер,
+        тело отменяется и выходит с ShardLeaseLost
+        """
+        await self._acquire(shard)
+        owner = asyncio.current_task()
+        lost = asyncio.Event()
+        renewer = asyncio.create_task(self._keep_lease(shard, owner, lost))
+        try:
+            yield
+        except asyncio.CancelledError:
+            if lost.is_set() and owner.uncancel() == 0:
+                raise ShardLeaseLost(f"shard {shard} lease lost by {self.__consumer}")
+            raise
+        finally:
+            renewer.cancel()
+            await self._release(shard)
+
+    async def read(self, shard: int, count: int = 100, block_ms: int = 5000) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Бесконечно отдаёт (id, payload) апдейтов шарда. Читать только под lease(shard):
+        сначала забирает неподтверждённые апдейты прошлого владельца, затем читает новые
+        """
+        key = self._key(shard)
+        await self._ensure_group(key)
+        await self._claim_pending(key)
+
+        last_id = "0"
+        while True:
+            response = await self.__cache.client.xreadgroup(
+                self.__group, self.__consumer, {key: last_id}, count=count, block=block_ms,
+            )
+            entries = response[0][1] if response else []
+
+            if last_id == "0" and not entries:
+                last_id = ">"
+                continue
+
+            for entry_id, fields in entries:
+                yield self._decode(entry_id), self._decode(fields.get("update") or fields.get(b"update"))
+
+    async def ack(self, shard: int, entry_id: str) -> None:
+        await self.__cache.client.xack(self._key(shard), self.__group, entry_id)
+
+    async def _acquire(self, shard: int) -> None:
+        key = self._lease_key(shard)
+        waiting = False
+        while not await self.__cache.client.set(key, self.__consumer, nx=True, px=self.__lease_ms):
+            if not waiting:
+                owner = await self.__cache.client.get(key)
+                logging.warning(f"shard {shard} is leased by {self._decode(owner) if owner else None}, waiting")
+                waiting = True
+            await asyncio.sleep(self.__lease_ms / 3000)
+        logging.info(f"consumer {self.__consumer} leased shard {shard}")
+
+    async def _keep_lease(self, shard: int, owner: asyncio.Task, lost: asyncio.Event) -> None:
+        """Продление каждую треть срока аренды; ошибка redis - не потеря, повторим на следующем шаге"""
+        while True:
+            await asyncio.sleep(self.__lease_ms / 3000)
+            try:
+                renewed = await self.__cache.client.eval(
+                    _RENEW_LEASE, 1, self._lease_key(shard), self.__consumer, self.__lease_ms,
+                )
+            except RedisError as e:
+                logging.warning(f"failed renew shard {shard} lease: {e.__repr__()}")
+                continue
+
+            if not renewed:
+                logging.warning(f"shard {shard} lease lost by {self.__consumer}")
+                lost.set()
+                owner.cancel()
+                return
+
+    async def _release(self, shard: int) -> None:
+        try:
+            await self.__cache.client.eval(_RELEASE_LEASE, 1, self._lease_key(shard), self.__consumer)
+        except RedisError as e:
+            logging.warning(f"failed release shard {shard} lease: {e.__repr__()}")
+
+    async def _claim_pending(self, key: str) -> None:
+        """
+        Неподтверждённые апдейты прошлых процессов переходят этому consumer'у и читаются первыми.
+        Без аренды вызывать нельзя: забрали бы апдейты у живого владельца
+        """
+        start_id = "0-0"
+        while True:
+            response = await self.__cache.client.xautoclaim(
+                key, self.__group, self.__consumer, min_idle_time=0, start_id=start_id, count=100,
+            )
+            start_id = self._decode(response[0])
+            if start_id == "0-0":
+                break
+
+        # consumer'ы прошлых процессов остались без апдейтов
+        for consumer in await self.__cache.client.xinfo_consumers(key, self.__group):
+            name = self._decode(consumer["name"])
+            if name != self.__consumer:
+                await self.__cache.client.xgroup_delconsumer(key, self.__group, name)
+
+    async def _ensure_group(self, key: str) -> None:
+        try:
+            await self.__cache.client.xgroup_create(key, self.__group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+            logging.debug(f"consumer group {self.__group} for {key} already exists")
+
+    @staticmethod
+    def _decode(value: str | bytes) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _key(self, shard: int) -> str:
+        return self.__cache.key(f"updates:{shard}")
+
+    def _lease_key(self, shard: int) -> str:
+        return self.__cache.key(f"updates:{shard}:lease")
@@ -23,6 +23,27 @@ class UOW:
     @classmethod
     @asynccontextmanager
     async def _readonly_impl(cls, session: AsyncSession) -> AsyncGenerator[None, None]:
+        # autocommit: каждый запрос - отдельная неявная транзакция, без BEGIN/ROLLBACK,
+        # не назначается xid и не держатся блокировки между запросами.
+        # уровень изоляции сбрасывается при возврате соединения в пул
         async with session.begin():
+            await session.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            yield
+
+    @classmethod
+    def snapshot(cls, session: AsyncSession) -> AsyncContextManager[None]:
+        return cls._snapshot_impl(session=session)
+
+    @classmethod
+    @asynccontextmanager
+    async def _snapshot_impl(cls, session: AsyncSession) -> AsyncGenerator[None, None]:
+        # SERIALIZABLE READ ONLY DEFERRABLE: согласованный снимок для долгих агрегатов,
+        # без риска serialization failure и без влияния на пишущие транзакции.
+        # DEFERRABLE в Postgres действует только вместе с SERIALIZABLE READ ONLY
+        async with session.begin():
+            await session.connection(execution_options={
+                "isolation_level": "SERIALIZABLE",
+                "postgresql_readonly": True,
+                "postgresql_deferrable": True,
+            })
             yield
-            await session.rollback()
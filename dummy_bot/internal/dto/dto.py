@@ -3,12 +3,15 @@ from datetime import datetime, timedelta
 from typing import List
 from aiogram.types import Message
 
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+
 
 @dataclass
 class StatisticFilterDTO:
     start_date: datetime
     end_date: datetime
-    limit: int = 10
+    limit: int | None = 10
+    period: PeriodEnum | None = None
 
 @dataclass
 class UserStatInfoDTO:
@@ -27,6 +30,13 @@ class MuteResponseDTO:
     delta_str: str
     reason: str|None
 
+@dataclass
+class PokakRecordDTO:
+    chat_id: int
+    user_chat_id: int
+    media_unique_id: str
+    created_at: datetime
+
 @dataclass
 class TelegramMessageDTO:
     chat_id: int
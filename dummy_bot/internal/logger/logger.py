@@ -1,8 +1,58 @@
 import json
 import logging
+import queue
 import sys
 from datetime import datetime
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(data: Any) -> str:
+    return json.dumps(data, default=str)
+
+
+def json_encoder_name(dumps: Callable[[Any], str]) -> str:
+    """Какой сериализатор реально пишет логи - для записи при старте"""
+    return "orjson" if dumps is fast_json_dumps and orjson is not None else "json"
+
+
+def fast_json_dumps(data: Any) -> str:
+    """orjson, если установлен, иначе стандартный json"""
+    if orjson is None:
+        return json_dumps(data)
+    return orjson.dumps(data, default=str).decode()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Кладёт записи в ограниченную очередь, не блокируясь:
+    при переполнении запись отбрасывается и учитывается в dropped
+    """
+
+    def __init__(self, q: queue.Queue) -> None:
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # форматирование целиком в потоке QueueListener
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # при остановке ждём место в очереди: всё, что уже в ней, будет записано
+        self.queue.put(self._sentinel)
 
 
 class Logger:
@@ -10,6 +60,7 @@ class Logger:
                  level: Optional[int] = logging.INFO,
                  handler: Optional[logging.Handler] = None,
                  formatter: Optional[logging.Formatter] = None,
+                 queue_size: int = 10_000,
                  ):
         self.__level = level
         if not handler:
@@ -22,32 +73,45 @@ class Logger:
 
         handler.setFormatter(formatter)
 
+        # форматирование и запись в stdout - в отдельном потоке, event loop только кладёт запись в очередь
+        self.__queue_handler = BoundedQueueHandler(queue.Queue(maxsize=queue_size))
+        self.__listener = DrainingQueueListener(self.__queue_handler.queue, handler, respect_handler_level=True)
+        self.__listener.start()
+
         self.__logger = logging.getLogger("custom_logger")
         self.__logger.setLevel(level)
 
         self.__logger.handlers.clear()
-        self.__logger.addHandler(handler)
+        self.__logger.addHandler(self.__queue_handler)
 
         self.__logger.propagate = False
 
+    @property
+    def dropped(self) -> int:
+        return self.__queue_handler.dropped
+
+    def stop(self) -> None:
+        """Дописывает очередь и останавливает поток записи"""
+        self.__listener.stop()
+
     def debug(self, message: str, **kwargs) -> None:
-        extra = {"data": kwargs, "timestamp": datetime.now().isoformat()}
-        return self.__logger.debug(message, extra=extra)
+        return self.__logger.debug(message, extra={"data": kwargs})
 
     def info(self, message: str, **kwargs) -> None:
-        extra = {"data": kwargs, "timestamp": datetime.now().isoformat()}
-        return self.__logger.info(message, extra=extra)
+        return self.__logger.info(message, extra={"data": kwargs})
 
     def warn(self, message: str, **kwargs) -> None:
-        extra = {"data": kwargs, "timestamp": datetime.now().isoformat()}
-        self.__logger.warning(message, extra=extra)
+        self.__logger.warning(message, extra={"data": kwargs})
 
     def error(self, message: str, **kwargs) -> None:
-        extra = {"data": kwargs, "timestamp": datetime.now().isoformat()}
-        return self.__logger.error(message, extra=extra)
+        return self.__logger.error(message, extra={"data": kwargs})
 
 
 class JSONCustomFormatter(logging.Formatter):
+    def __init__(self, dumps: Callable[[Any], str] = json_dumps, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.dumps = dumps
+
     def format(self, record: logging.LogRecord) -> str:
         timestamp = datetime.fromtimestamp(record.created).strftime('%Y-%m-%dT%H:%M:%S')
 
@@ -65,7 +129,7 @@ class JSONCustomFormatter(logging.Formatter):
                 "exception": self.formatException(record.exc_info),
             })
 
-        return json.dumps(data)
+        return self.dumps(data)
 
 
 class TextCustomFormatter(logging.Formatter):
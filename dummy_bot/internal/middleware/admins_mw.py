@@ -1,9 +1,13 @@
-from functools import wraps
-from typing import Callable, Dict, Any, Awaitable, List, Protocol, Optional
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Any, Awaitable, List, Protocol, Optional, Tuple
 
 from aiogram import BaseMiddleware, Bot
 from aiogram.types import Message
 
+from dummy_bot.internal.utils.ttl_cache import TTLCache, MISSING
+
 
 class ICache(Protocol):
     async def get(self, key: str):
@@ -12,10 +16,28 @@ class ICache(Protocol):
     async def set(self, key: str, value: str, expire: Optional[int] = None):
         ...
 
+    async def delete(self, key: str):
+        ...
+
 
 class AdminsMiddleware(BaseMiddleware):
-    def __init__(self, cache: ICache):
+    """
+    Список админов чата: L1-кэш в процессе -> redis -> getChatAdministrators.
+    Запрос к Telegram по чату выполняется не более одного одновременно,
+    а перед истечением TTL список обновляется в фоне.
+
+    Если бот сам админ чата, ему приходят chat_member апдейты и список поддерживается
+    ими (apply_member_update), поэтому хранится долго (long_ttl); иначе - ttl
+    """
+
+    def __init__(self, cache: ICache, ttl: int = 40, long_ttl: int = 6 * 3600, l1_maxsize: int = 10_000):
         self.__cache = cache
+        self.__ttl = ttl
+        self.__long_ttl = long_ttl
+        # L1 короткий: другие реплики бота могли обновить список в redis
+        # (admins, fetched_at, ttl) по chat_id
+        self.__l1 = TTLCache(maxsize=l1_maxsize, ttl=ttl)
+        self.__inflight: Dict[int, asyncio.Task] = {}
 
     async def __call__(
             self,
@@ -33,46 +55,100 @@ class AdminsMiddleware(BaseMiddleware):
 
         return await handler(event, data)
 
-    @staticmethod
-    def _cache_admins(ttl: int = 60):
-        def decorator(fn):
-            @wraps(fn)
-            async def wrapper(self, *args, **kwargs):
-                bot, chat_id = args
-
-                try:
-                    return await self._get_admins_from_cache(str(chat_id))
-                except Exception as e:
-                    print(f"failed get from cache: {e.__repr__()}")
-
-                admins = await fn(self, *args)
-
-                try:
-                    await self._set_admins_to_cache(str(chat_id), admins, ttl)
-                except Exception as e:
-                    print(f"failed set to cache: {e.__repr__()}")
-
-                return admins
-            return wrapper
-        return decorator
-
-    @_cache_admins(ttl=40)
     async def _get_chat_administrators(self, bot: Bot, chat_id: int) -> List[int]:
-        return [
-            admin.user.id for admin
-            in await bot.get_chat_administrators(chat_id)
-            if not admin.user.is_bot
-        ]
-
-    async def _get_admins_from_cache(self, key: str) -> List[int]:
-        admins = await self.__cache.get(key)
-        if not admins:
+        entry = self.__l1.get(chat_id)
+
+        if entry is MISSING:
+            try:
+                entry = await self._get_admins_from_cache(str(chat_id))
+                self.__l1.set(chat_id, entry)
+            except Exception as e:
+                logging.debug(f"failed get from cache: {e.__repr__()}")
+                return await self._fetch(bot, chat_id)
+
+        admins, fetched_at, ttl = entry
+        if time.time() - fetched_at >= ttl * 3 / 4:
+            # stale-while-revalidate: отвечаем текущим списком, обновляем в фоне
+            self._start_fetch(bot, chat_id)
+
+        return admins
+
+    async def _fetch(self, bot: Bot, chat_id: int) -> List[int]:
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(self._start_fetch(bot, chat_id))
+
+    def _start_fetch(self, bot: Bot, chat_id: int) -> asyncio.Task:
+        task = self.__inflight.get(chat_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(bot, chat_id))
+            task.add_done_callback(lambda t: self._fetch_done(chat_id, t))
+            self.__inflight[chat_id] = task
+        return task
+
+    def _fetch_done(self, chat_id: int, task: asyncio.Task) -> None:
+        self.__inflight.pop(chat_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"failed get chat administrators: {task.exception().__repr__()}")
+
+    async def _fetch_and_store(self, bot: Bot, chat_id: int) -> List[int]:
+        members = await bot.get_chat_administrators(chat_id)
+        admins = [admin.user.id for admin in members if not admin.user.is_bot]
+        bot_is_admin = any(admin.user.id == bot.id for admin in members)
+
+        await self._store(chat_id, admins, time.time(), self.__long_ttl if bot_is_admin else self.__ttl)
+        return admins
+
+    async def apply_member_update(self, chat_id: int, user_id: int, is_admin: bool) -> None:
+        """Повышение/понижение участника из chat_member апдейта"""
+        entry = self.__l1.get(chat_id)
+        if entry is MISSING:
+            try:
+                entry = await self._get_admins_from_cache(str(chat_id))
+            except Exception as e:
+                # списка нет - при следующем запросе он загрузится целиком
+                logging.debug(f"failed get from cache: {e.__repr__()}")
+                return
+
+        admins, fetched_at, ttl = entry
+        if is_admin == (user_id in admins):
+            return
+
+        admins = admins + [user_id] if is_admin else [admin for admin in admins if admin != user_id]
+        await self._store(chat_id, admins, fetched_at, ttl)
+
+    async def invalidate(self, chat_id: int) -> None:
+        """Сброс списка, например когда у бота изменились права в чате"""
+        self.__l1.invalidate(chat_id)
+        try:
+            await self.__cache.delete(str(chat_id))
+        except Exception as e:
+            logging.warning(f"failed delete from cache: {e.__repr__()}")
+
+    async def _store(self, chat_id: int, admins: List[int], fetched_at: float, ttl: int) -> None:
+        self.__l1.set(chat_id, (admins, fetched_at, ttl))
+
+        expire = int(fetched_at + ttl - time.time())
+        if expire <= 0:
+            return
+        try:
+            await self._set_admins_to_cache(str(chat_id), admins, fetched_at, ttl, expire)
+        except Exception as e:
+            logging.warning(f"failed set to cache: {e.__repr__()}")
+
+    async def _get_admins_from_cache(self, key: str) -> Tuple[List[int], float, int]:
+        value = await self.__cache.get(key)
+        if not value:
             raise AttributeError(f"no data for key: {key}")
-        return [int(admin) for admin in str(admins).split(";")]
 
-    async def _set_admins_to_cache(self, key: str, data: List[int], ttl: int = 10) -> None:
+        parts = str(value).split("|")
+        fetched_at = float(parts[0]) if len(parts) > 1 else 0.0
+        ttl = int(parts[1]) if len(parts) > 2 else self.__ttl
+        return [int(admin) for admin in parts[-1].split(";") if admin], fetched_at, ttl
+
+    async def _set_admins_to_cache(self, key: str, data: List[int], fetched_at: float, ttl: int,
+                                   expire: int) -> None:
         await self.__cache.set(
             key=key,
-            value=';'.join(list(map(str, data))),
-            expire=ttl,
-        )
\ No newline at end of file
+            value=f"{fetched_at}|{ttl}|{';'.join(map(str, data))}",
+            expire=expire,
+        )
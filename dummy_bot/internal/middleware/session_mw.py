@@ -1,11 +1,17 @@
 from typing import Callable, Dict, Any, Awaitable
 
 from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
 from aiogram.types import TelegramObject
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 
 class DBSessionMiddleware(BaseMiddleware):
+    """
+    Inner middleware: вызывается только после прохождения фильтров
+    и открывает сессию, только если хендлер принимает аргумент session
+    """
+
     def __init__(self, session_pool: async_sessionmaker):
         super().__init__()
         self.session_pool = session_pool
@@ -16,6 +22,15 @@ class DBSessionMiddleware(BaseMiddleware):
             event: TelegramObject,
             data: Dict[str, Any],
     ) -> Any:
+        if not self._needs_session(data.get("handler")):
+            return await handler(event, data)
+
         async with self.session_pool() as session:
             data["session"] = session
-            return await handler(event, data)
\ No newline at end of file
+            return await handler(event, data)
+
+    @staticmethod
+    def _needs_session(handler_object: HandlerObject | None) -> bool:
+        if handler_object is None:
+            return True
+        return handler_object.varkw or "session" in handler_object.params
@@ -0,0 +1,91 @@
+import logging
+import time
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod, Response
+from aiogram.methods.base import TelegramType
+
+from dummy_bot.internal.utils.metrics import TELEGRAM_REQUEST_DURATION, TELEGRAM_REQUEST_ERRORS
+from dummy_bot.internal.utils.outbound import OutboundScheduler, Priority
+from dummy_bot.internal.utils.tracing import TRACER
+
+MODERATION_METHODS = {"restrictChatMember", "banChatMember", "unbanChatMember", "deleteMessage"}
+REACTION_METHODS = {"setMessageReaction"}
+
+
+class TelegramMetricsMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: время и ошибки запросов к Bot API по методам"""
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        start = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception:
+            TELEGRAM_REQUEST_ERRORS.inc(name)
+            raise
+        finally:
+            TELEGRAM_REQUEST_DURATION.observe(time.perf_counter() - start, name)
+
+
+class TelegramTracingMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: спан на каждый запрос к Bot API"""
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        with TRACER.span(f"telegram.{method.__api_method__}"):
+            return await make_request(bot, method)
+
+
+class RateLimitMiddleware(BaseRequestMiddleware):
+    """
+    Middleware сессии бота: запросы в чат проходят через token bucket чата и общий,
+    модерация - вне очереди, реакции - последними; на 429 ждём retry_after и повторяем
+    """
+
+    def __init__(self, scheduler: OutboundScheduler, retries: int = 3):
+        self.scheduler = scheduler
+        self.retries = retries
+
+    async def __call__(
+            self,
+            make_request: NextRequestMiddlewareType[TelegramType],
+            bot: Bot,
+            method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = method.__api_method__
+        # getUpdates, getChatAdministrators и прочие чтения не лимитируем
+        if name.startswith("get"):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        priority = self._priority(name)
+
+        for attempt in range(self.retries + 1):
+            await self.scheduler.acquire(chat_id, priority)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"{name} to chat {chat_id} hit flood control, retry after {e.retry_after}s")
+                self.scheduler.pause(chat_id, e.retry_after)
+
+    @staticmethod
+    def _priority(name: str) -> Priority:
+        if name in MODERATION_METHODS:
+            return Priority.MODERATION
+        if name in REACTION_METHODS:
+            return Priority.REACTION
+        return Priority.NORMAL
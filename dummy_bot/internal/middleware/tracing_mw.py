@@ -0,0 +1,48 @@
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from dummy_bot.internal.utils.tracing import TRACER
+
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """
+    Outer middleware апдейтов: корневой спан на апдейт.
+    Спан доступен дальше по цепочке как data["span"]
+    """
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: Update,
+            data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        with TRACER.span(
+                "update",
+                root=True,
+                update_id=event.update_id,
+                event_type=event.event_type,
+                chat_id=chat.id if chat else None,
+        ) as span:
+            data["span"] = span
+            return await handler(event, data)
+
+
+class TracedMiddleware(BaseMiddleware):
+    """Оборачивает middleware в дочерний спан с именем его класса"""
+
+    def __init__(self, middleware: BaseMiddleware):
+        super().__init__()
+        self.middleware = middleware
+        self.name = middleware.__class__.__name__
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any],
+    ) -> Any:
+        with TRACER.span(self.name):
+            return await self.middleware(handler, event, data)
@@ -1,9 +1,10 @@
-from datetime import datetime
+from datetime import datetime, date
 
 from sqlalchemy import (
     PrimaryKeyConstraint,
     UniqueConstraint,
     ForeignKey, BigInteger,
+    Index,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, Mapped, mapped_column
@@ -36,6 +37,7 @@ class Media(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('id', name='media_id'),
+        Index('ix_medias_group_id', 'group_id'),
     )
 
 
@@ -55,6 +57,7 @@ class User(Base):
     __table_args__ = (
         PrimaryKeyConstraint('id', name='user_id'),
         UniqueConstraint("chat_id", "group_id", name="chat_in_group"),
+        Index('ix_users_group_id_is_active', 'group_id', 'is_active'),
     )
 
     def activate(self) -> None:
@@ -74,4 +77,19 @@ class Pokak(Base):
 
     __table_args__ = (
         PrimaryKeyConstraint('id', name='pokak_id'),
+        Index('ix_pokaks_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+
+class PokakDailyCount(Base):
+    """Суточный счётчик покаков, заполняется триггером на pokaks"""
+    __tablename__ = 'pokak_daily_counts'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    day: Mapped[date] = mapped_column(nullable=False)
+    count: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('user_id', 'day', name='pokak_daily_count_id'),
+        Index('ix_pokak_daily_counts_user_id_day', 'user_id', 'day', postgresql_include=['count']),
     )
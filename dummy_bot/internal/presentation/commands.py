@@ -11,7 +11,7 @@ from dummy_bot.internal.dto.enums import StatisticEnum
 from dummy_bot.internal.fsm.fsm import SetMedia
 from dummy_bot.internal.utils.stat_flter import PeriodEnum
 from dummy_bot.internal.presentation.decorators import enriched_logger
-from dummy_bot.internal.presentation.interfaces import ICommandUseCase, ILogger, IStatisticsUseCase
+from dummy_bot.internal.presentation.interfaces import ICommandUseCase, ILogger, IStatisticsUseCase, IReportCache
 from dummy_bot.internal.utils.stat_report import ReportStat
 
 
@@ -23,12 +23,14 @@ class CommandsRouter:
             logger: ILogger,
             commands_use_case: ICommandUseCase,
             stat_use_case: IStatisticsUseCase,
+            report_cache: IReportCache,
     ):
         self.__router = router
         self.__admin_router = admin_router
         self.__logger = logger
         self.__commands_use_case = commands_use_case
         self.__stat_use_case = stat_use_case
+        self.__report_cache = report_cache
         self.__register_router()
 
     def __register_router(self) -> None:
@@ -73,10 +75,15 @@ class CommandsRouter:
             command = dto.text[1:].split("@")[0]
             period = PeriodEnum.from_command(command)
 
-            f = StatisticFilterDTO(*period.get_date_scope())
+            report, generation = self.__report_cache.get(dto.chat_id, period)
+            if report is None:
+                f = StatisticFilterDTO(*period.get_date_scope(), period=period)
+
+                stat = await self.__stat_use_case.statistics(session, dto, f)
+                report = ReportStat(period, stat.data, f.limit).prepare()
+                # покак или смена участников во время запроса: set не запишет устаревший отчёт
+                self.__report_cache.set(dto.chat_id, period, report, generation)
 
-            stat = await self.__stat_use_case.statistics(session, dto, f)
-            report = ReportStat(period, stat.data, f.limit).prepare()
             await message.reply(report)
 
         @self.__admin_router.message(Command(commands=["setpokakmedia"]))
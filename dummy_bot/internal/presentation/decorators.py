@@ -1,16 +1,23 @@
-from datetime import datetime as dt
 import functools
+import random
+import time
 from typing import Callable, Any
 
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, ChatMemberUpdated
 
 from dummy_bot.internal.presentation.interfaces import ILogger
+from dummy_bot.internal.utils.metrics import HANDLER_DURATION, HANDLER_CALLS
+from dummy_bot.internal.utils.tracing import TRACER
 
 
-def enriched_logger(logger: ILogger, class_name: str):
+def enriched_logger(logger: ILogger, class_name: str, success_sample_rate: float = 1.0):
+    """
+    Лог и метрики вызова хендлера. Ошибки логируются всегда,
+    успешные вызовы - с вероятностью success_sample_rate
+    """
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
-        async def wrapper(event: Message | CallbackQuery, *args, **kwargs) -> Any:
+        async def wrapper(event: Message | CallbackQuery | ChatMemberUpdated, *args, **kwargs) -> Any:
             method_name = func.__name__
             call = f"{class_name}.{method_name}"
 
@@ -42,21 +49,39 @@ def enriched_logger(logger: ILogger, class_name: str):
                     "chat_id": event.message.chat.id if event.message else None,
                 })
 
-            start = dt.now()
+            elif isinstance(event, ChatMemberUpdated):
+                context.update({
+                    "chat_id": event.chat.id,
+                    "user_id": event.from_user.id,
+                    "member_id": event.new_chat_member.user.id,
+                    "old_status": event.old_chat_member.status,
+                    "new_status": event.new_chat_member.status,
+                    "date": event.date.isoformat() if event.date else None,
+                })
+
+            start = time.perf_counter()
 
             try:
-                result = await func(event, *args, **kwargs)
-                logger.info(
-                    f"success",
-                    **context,
-                    duration=f"{(dt.now() - start).microseconds // 1000}ms"
-                )
+                with TRACER.span(call):
+                    result = await func(event, *args, **kwargs)
+                duration = time.perf_counter() - start
+                HANDLER_DURATION.observe(duration, call)
+                HANDLER_CALLS.inc(call, "success")
+                if success_sample_rate >= 1 or random.random() < success_sample_rate:
+                    logger.info(
+                        f"success",
+                        **context,
+                        duration=f"{duration * 1000:.0f}ms"
+                    )
                 return result
             except Exception as e:
+                duration = time.perf_counter() - start
+                HANDLER_DURATION.observe(duration, call)
+                HANDLER_CALLS.inc(call, "error")
                 logger.warn(
                     f"error: {e.__cause__}",
                     **context,
-                    duration=f"{(dt.now() - start).microseconds // 1000}ms"
+                    duration=f"{duration * 1000:.0f}ms"
                 )
                 raise
 
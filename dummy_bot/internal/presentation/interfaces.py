@@ -1,8 +1,9 @@
-from typing import Protocol
+from typing import Awaitable, Protocol, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.dto.dto import StatisticFilterDTO, StatisticResponseDTO, MuteResponseDTO, TelegramMessageDTO
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
 
 
 class ICommandUseCase(Protocol):
@@ -27,6 +28,12 @@ class IMuteUseCase(Protocol):
     async def mute(self, dto: TelegramMessageDTO) -> MuteResponseDTO|None: ...
 
 
+class IReportCache(Protocol):
+    def get(self, chat_id: int, period: PeriodEnum) -> Tuple[str | None, int]: ...
+
+    def set(self, chat_id: int, period: PeriodEnum, report: str, generation: int) -> bool: ...
+
+
 class ILogger(Protocol):
     def debug(self, message: str, *args, **kwargs) -> None: ...
 
@@ -35,3 +42,13 @@ class ILogger(Protocol):
     def warn(self, message: str, *args, **kwargs) -> None: ...
 
     def error(self, message: str, *args, **kwargs) -> None: ...
+
+
+class IAdminsCache(Protocol):
+    async def apply_member_update(self, chat_id: int, user_id: int, is_admin: bool) -> None: ...
+
+    async def invalidate(self, chat_id: int) -> None: ...
+
+
+class IOutboundSender(Protocol):
+    def spawn(self, request: Awaitable, chat_id: int | str | None) -> None: ...
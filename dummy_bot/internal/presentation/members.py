@@ -0,0 +1,50 @@
+from aiogram import Router
+from aiogram.enums import ChatMemberStatus
+from aiogram.types import ChatMemberUpdated
+
+from dummy_bot.internal.presentation.decorators import enriched_logger
+from dummy_bot.internal.presentation.interfaces import IAdminsCache, ILogger
+
+ADMIN_STATUSES = (ChatMemberStatus.CREATOR, ChatMemberStatus.ADMINISTRATOR)
+
+
+class MembersRouter:
+    """Поддержка кэша админов по chat_member/my_chat_member апдейтам вместо опроса по TTL"""
+
+    def __init__(
+            self,
+            router: Router,
+            logger: ILogger,
+            admins_cache: IAdminsCache,
+    ) -> None:
+        self._router = router
+        self._logger = logger
+        self._admins_cache = admins_cache
+        self._register_router()
+
+    def _register_router(self):
+        class_name = self.__class__.__name__
+
+        @self._router.chat_member()
+        @enriched_logger(self._logger, class_name)
+        async def chat_member(event: ChatMemberUpdated) -> None:
+            user = event.new_chat_member.user
+            was_admin = event.old_chat_member.status in ADMIN_STATUSES
+            is_admin = event.new_chat_member.status in ADMIN_STATUSES
+
+            if user.is_bot or was_admin == is_admin:
+                return
+
+            await self._admins_cache.apply_member_update(event.chat.id, user.id, is_admin)
+            self._logger.info(
+                "admins updated",
+                chat_id=event.chat.id,
+                user_id=user.id,
+                is_admin=is_admin,
+            )
+
+        @self._router.my_chat_member()
+        @enriched_logger(self._logger, class_name)
+        async def my_chat_member(event: ChatMemberUpdated) -> None:
+            # права бота изменились: меняется и то, приходят ли ему chat_member апдейты
+            await self._admins_cache.invalidate(event.chat.id)
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.dto.dto import TelegramMessageDTO
 from dummy_bot.internal.presentation.decorators import enriched_logger
-from dummy_bot.internal.presentation.interfaces import ILogger, IPokakUseCase, IMuteUseCase
+from dummy_bot.internal.presentation.interfaces import ILogger, IPokakUseCase, IMuteUseCase, IOutboundSender
 
 
 class TextRouter:
@@ -15,13 +15,17 @@ class TextRouter:
                  admin_router: Router,
                  logger: ILogger,
                  pokak_use_case: IPokakUseCase,
-                 mute_use_case: IMuteUseCase
+                 mute_use_case: IMuteUseCase,
+                 sender: IOutboundSender,
+                 success_log_sample_rate: float = 1.0,
                  ) -> None:
         self._router = router
         self._admin_router = admin_router
         self._logger = logger
         self._pokak_use_case = pokak_use_case
         self._mute_use_case = mute_use_case
+        self._sender = sender
+        self._success_log_sample_rate = success_log_sample_rate
         self._register_router()
 
     def _register_router(self) -> None:
@@ -61,11 +65,10 @@ class TextRouter:
             await message.reply(
                 f"Мут для @{mute_username} на {resp.delta_str}. {mute_desc or ''}")
 
-        @self._router.message(F.entities.func(lambda entities: not entities))
-        @enriched_logger(self._logger, class_name)
+        @self._router.message(F.animation | F.sticker, F.entities.func(lambda entities: not entities))
+        @enriched_logger(self._logger, class_name, success_sample_rate=self._success_log_sample_rate)
         async def handle_text(message: Message, session: AsyncSession) -> None:
-            if message.animation or message.sticker:
-                dto = TelegramMessageDTO.from_message(message)
-                if await self._pokak_use_case.add(session, dto):
-                    await message.react([ReactionTypeEmoji(emoji="👌")])
-                    return
+            dto = TelegramMessageDTO.from_message(message)
+            if await self._pokak_use_case.add(session, dto):
+                # реакция в фоне: хендлер не ждёт лимитов чата и ответа Telegram
+                self._sender.spawn(message.react([ReactionTypeEmoji(emoji="👌")]), message.chat.id)
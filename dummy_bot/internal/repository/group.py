@@ -1,4 +1,5 @@
 from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.models.models import Group
@@ -17,14 +18,22 @@ class GroupRepository:
     async def insert(session: AsyncSession, group: Group) -> Group|None:
         session.add(group)
         await session.flush()
-        await session.refresh(group)
         return group
 
+    @staticmethod
+    async def insert_if_not_exists(session: AsyncSession, chat_id: int) -> None:
+        stmt = insert(Group).values(
+            group_id=chat_id,
+        ).on_conflict_do_nothing(
+            index_elements=[Group.group_id],
+        )
+
+        await session.execute(stmt)
+
     @staticmethod
     async def update(session: AsyncSession, group: Group) -> Group|None:
         group = await session.merge(group)
         await session.flush()
-        await session.refresh(group)
         return group
 
     @staticmethod
@@ -0,0 +1,150 @@
+import json
+import logging
+from datetime import datetime as dt
+from typing import List, Protocol
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from dummy_bot.internal.dto.dto import UserStatInfoDTO
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+
+
+class IRedisClient(Protocol):
+    @property
+    def client(self) -> Redis: ...
+
+    def key(self, key: str) -> str: ...
+
+
+# участник с -inf: рейтинг построен, даже если в группе никто ещё не покакал
+_BUILT_MARKER = "built"
+
+# ZINCRBY только в уже построенные рейтинги: частично заполненный ключ выглядел бы как полный.
+# Версия чата растёт на каждый покак: rebuild по данным, прочитанным раньше, увидит другую версию
+_INCREMENT_EXISTING = """
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+for i = 2, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('ZINCRBY', KEYS[i], 1, ARGV[1])
+    end
+end
+return 0
+"""
+
+# запись рейтинга, только если с чтения версии перед запросом в БД чат не менялся
+_REBUILD_IF_VERSION = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+redis.call('ZADD', KEYS[2], '-inf', ARGV[4])
+for i = 5, #ARGV, 3 do
+    redis.call('ZADD', KEYS[2], ARGV[i + 1], ARGV[i])
+    redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 2])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[3], ARGV[3])
+return 1
+"""
+
+
+class LeaderboardRepository:
+    def __init__(self, cache: IRedisClient, max_ttl: int = 3600) -> None:
+        self.__cache = cache
+        self.__max_ttl = max_ttl
+
+    async def increment(self, chat_id: int, user_id: int) -> None:
+        keys = [self._version_key(chat_id), *[self._key(chat_id, period) for period in PeriodEnum]]
+        try:
+            await self.__cache.client.eval(_INCREMENT_EXISTING, len(keys), *keys, str(user_id), self.__max_ttl)
+        except RedisError as e:
+            logging.warning(f"failed increment leaderboard: {e.__repr__()}")
+
+    async def top(self, chat_id: int, period: PeriodEnum, limit: int) -> List[UserStatInfoDTO] | None:
+        try:
+            rows = await self.__cache.client.zrevrange(self._key(chat_id, period), 0, limit, withscores=True)
+            if not rows:
+                return None
+
+            rows = [
+                (member, score) for member, score in rows
+                if member not in (_BUILT_MARKER, _BUILT_MARKER.encode())
+            ][:limit]
+            if not rows:
+                return []
+
+            names = await self.__cache.client.hmget(self._names_key(chat_id), [member for member, _ in rows])
+        except RedisError as e:
+            logging.warning(f"failed get leaderboard: {e.__repr__()}")
+            return None
+
+        if not all(names):
+            return None
+
+        return [
+            UserStatInfoDTO(int(member), *json.loads(name), int(score))
+            for (member, score), name in zip(rows, names)
+        ]
+
+    async def version(self, chat_id: int) -> int | None:
+        """Версия чата; читается до запроса в БД и передаётся в rebuild"""
+        try:
+            return int(await self.__cache.client.get(self._version_key(chat_id)) or 0)
+        except RedisError as e:
+            logging.warning(f"failed get leaderboard version: {e.__repr__()}")
+            return None
+
+    async def rebuild(self, chat_id: int, period: PeriodEnum, data: List[UserStatInfoDTO], version: int | None) -> bool:
+        """
+        Записывает рейтинг, построенный по БД. Если после чтения version в чате были покаки
+        или смена участников, данные могли устареть - рейтинг не пишется, его построит следующий запрос
+        """
+        if version is None:
+            return False
+
+        args = [version, self._ttl(period), self.__max_ttl, _BUILT_MARKER]
+        for row in data:
+            args.extend([str(row.user_id), row.count, json.dumps([row.username, row.fullname])])
+
+        try:
+            return bool(await self.__cache.client.eval(
+                _REBUILD_IF_VERSION, 3,
+                self._version_key(chat_id), self._key(chat_id, period), self._names_key(chat_id),
+                *args,
+            ))
+        except RedisError as e:
+            logging.warning(f"failed rebuild leaderboard: {e.__repr__()}")
+            return False
+
+    async def invalidate(self, chat_id: int) -> None:
+        try:
+            async with self.__cache.client.pipeline(transaction=True) as pipe:
+                # новая версия: rebuild, уже прочитавший БД до смены участников, не запишется
+                pipe.incr(self._version_key(chat_id))
+                pipe.expire(self._version_key(chat_id), self.__max_ttl)
+                pipe.delete(
+                    *[self._key(chat_id, period) for period in PeriodEnum],
+                    self._names_key(chat_id),
+                )
+                await pipe.execute()
+        except RedisError as e:
+            logging.warning(f"failed invalidate leaderboard: {e.__repr__()}")
+
+    def _ttl(self, period: PeriodEnum) -> int:
+        if period == PeriodEnum.ALL:
+            return self.__max_ttl
+
+        _, end = period.get_date_scope()
+        return max(1, min(self.__max_ttl, int((end - dt.now()).total_seconds())))
+
+    def _key(self, chat_id: int, period: PeriodEnum) -> str:
+        start, _ = period.get_date_scope()
+        return self.__cache.key(f"leaderboard:{chat_id}:{period.value}:{start.date().isoformat()}")
+
+    def _names_key(self, chat_id: int) -> str:
+        return self.__cache.key(f"leaderboard:{chat_id}:users")
+
+    def _version_key(self, chat_id: int) -> str:
+        return self.__cache.key(f"leaderboard:{chat_id}:version")
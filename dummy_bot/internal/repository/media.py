@@ -21,12 +21,10 @@ class MediaRepository:
     async def insert(session: AsyncSession, media: Media) -> Media:
         session.add(media)
         await session.flush()
-        await session.refresh(media)
         return media
 
     @staticmethod
     async def update(session: AsyncSession, media: Media) -> Media:
         media = await session.merge(media)
         await session.flush()
-        await session.refresh(media)
         return media
@@ -1,6 +1,10 @@
+from typing import List, Tuple
+
+from sqlalchemy import select, insert, and_, values, column, BigInteger, String, DateTime
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from dummy_bot.internal.models.models import Pokak
+from dummy_bot.internal.dto.dto import PokakRecordDTO
+from dummy_bot.internal.models.models import Pokak, User, Group, Media
 
 
 class PokakRepository:
@@ -9,5 +13,80 @@ class PokakRepository:
     async def insert(session: AsyncSession, pokak: Pokak) -> Pokak:
         session.add(pokak)
         await session.flush()
-        await session.refresh(pokak)
-        return pokak
\ No newline at end of file
+        return pokak
+
+    @staticmethod
+    async def insert_if_tracked(session: AsyncSession, chat_id: int, user_chat_id: int, media_unique_id: str) -> int | None:
+        """
+        Записывает покак одним запросом, если группа подключена, пользователь активен
+        и медиа совпадает с медиа группы. Возвращает id пользователя или None
+        """
+        source = select(
+            User.id,
+        ).join(
+            Group, Group.id == User.group_id
+        ).join(
+            Media, Media.group_id == Group.id
+        ).where(
+            and_(
+                Group.group_id == chat_id,
+                User.chat_id == user_chat_id,
+                User.is_active.is_(True),
+                Media.media_unique_id == media_unique_id,
+            )
+        ).limit(1)
+
+        stmt = insert(Pokak).from_select([Pokak.user_id], source).returning(Pokak.user_id)
+
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def insert_batch_if_tracked(session: AsyncSession, records: List[PokakRecordDTO]) -> List[Tuple[int, int]]:
+        """
+        Пакетный вариант insert_if_tracked: один INSERT на все записи.
+        Возвращает пары (chat_id, id пользователя) для записанных покаков
+        """
+        rows = values(
+            column("chat_id", BigInteger),
+            column("user_chat_id", BigInteger),
+            column("media_unique_id", String),
+            column("created_at", DateTime),
+            name="records",
+        ).data([
+            (r.chat_id, r.user_chat_id, r.media_unique_id, r.created_at) for r in records
+        ])
+
+        source = select(
+            User.id,
+            rows.c.created_at,
+        ).select_from(rows).join(
+            Group, Group.group_id == rows.c.chat_id
+        ).join(
+            User, and_(
+                User.group_id == Group.id,
+                User.chat_id == rows.c.user_chat_id,
+                User.is_active.is_(True),
+            )
+        ).join(
+            Media, and_(
+                Media.group_id == Group.id,
+                Media.media_unique_id == rows.c.media_unique_id,
+            )
+        )
+
+        inserted = insert(Pokak).from_select(
+            [Pokak.user_id, Pokak.created_at], source
+        ).returning(Pokak.user_id).cte("inserted")
+
+        stmt = select(
+            Group.group_id,
+            inserted.c.user_id,
+        ).select_from(inserted).join(
+            User, User.id == inserted.c.user_id
+        ).join(
+            Group, Group.id == User.group_id
+        )
+
+        result = await session.execute(stmt)
+        return [(chat_id, user_id) for chat_id, user_id in result.all()]
@@ -1,9 +1,10 @@
-from typing import List
+from datetime import datetime, time, timedelta
+from typing import List, Tuple
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, or_, func, literal, union_all, delete, insert, text, Date, cast, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from dummy_bot.internal.models.models import Group, Pokak, User
+from dummy_bot.internal.models.models import Group, Pokak, PokakDailyCount, User
 from dummy_bot.internal.dto.dto import StatisticFilterDTO, UserStatInfoDTO
 
 
@@ -11,27 +12,90 @@ class StatisticsRepository:
 
     @staticmethod
     async def statistics(session: AsyncSession, group: Group, f: StatisticFilterDTO) -> List[UserStatInfoDTO]:
-        stmt = select(
-            User.id,
-            User.username,
-            User.fullname,
-            func.count(Pokak.id).label("count"),
-        ).select_from(Pokak).join(
-            User, User.id == Pokak.user_id
-        ).filter(
+        result = await session.execute(StatisticsRepository.statistics_query(group, f))
+
+        return [UserStatInfoDTO(*row) for row in result.all()]
+
+    @staticmethod
+    def statistics_query(group: Group, f: StatisticFilterDTO) -> Select:
+        full_start, full_end = StatisticsRepository._full_days(f.start_date, f.end_date)
+
+        members = select(User.id).where(
             and_(
                 User.group_id == group.id,
                 User.is_active.is_(True),
-                Pokak.created_at.between(f.start_date, f.end_date)
             )
+        )
+
+        # полные сутки берём из суточных счётчиков, неполные края периода - из сырых покаков
+        daily = select(
+            PokakDailyCount.user_id,
+            PokakDailyCount.count.label("count"),
+        ).where(
+            and_(
+                PokakDailyCount.user_id.in_(members),
+                PokakDailyCount.day >= full_start.date(),
+                PokakDailyCount.day < full_end.date(),
+            )
+        )
+
+        raw = select(
+            Pokak.user_id,
+            literal(1).label("count"),
+        ).where(
+            and_(
+                Pokak.user_id.in_(members),
+                or_(
+                    and_(Pokak.created_at >= f.start_date, Pokak.created_at < full_start),
+                    and_(Pokak.created_at >= full_end, Pokak.created_at <= f.end_date),
+                ),
+            )
+        )
+
+        counts = union_all(daily, raw).subquery()
+        total = func.sum(counts.c.count)
+
+        stmt = select(
+            User.id,
+            User.username,
+            User.fullname,
+            total.label("count"),
+        ).select_from(counts).join(
+            User, User.id == counts.c.user_id
         ).group_by(
             User.id,
         ).order_by(
-            func.count(Pokak.id).desc()
+            total.desc()
         ).limit(
             f.limit
         )
 
-        result = await session.execute(stmt)
+        return stmt
 
-        return [UserStatInfoDTO(*row) for row in result.all()]
+    @staticmethod
+    async def rebuild_daily_counts(session: AsyncSession) -> None:
+        await session.execute(text("LOCK TABLE pokaks IN SHARE MODE"))
+        await session.execute(delete(PokakDailyCount))
+
+        day = cast(Pokak.created_at, Date)
+        stmt = insert(PokakDailyCount).from_select(
+            [PokakDailyCount.user_id, PokakDailyCount.day, PokakDailyCount.count],
+            select(Pokak.user_id, day, func.count(Pokak.id)).group_by(Pokak.user_id, day),
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    def _full_days(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+        """Границы [full_start, full_end) целых суток, лежащих внутри [start, end]"""
+        full_start = datetime.combine(start.date(), time.min)
+        if full_start < start:
+            full_start += timedelta(days=1)
+
+        full_end = datetime.combine(end.date(), time.min)
+        if end - full_end >= timedelta(days=1) - timedelta(microseconds=1):
+            full_end += timedelta(days=1)
+
+        if full_end < full_start:
+            return end, end
+
+        return full_start, full_end
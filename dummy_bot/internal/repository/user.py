@@ -1,4 +1,7 @@
-from sqlalchemy import select, and_, delete
+from datetime import datetime
+
+from sqlalchemy import select, and_, delete, update, literal, BigInteger
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.models.models import User, Group
@@ -22,14 +25,64 @@ class UserRepository:
     async def insert(session: AsyncSession, user: User) -> User|None:
         session.add(user)
         await session.flush()
-        await session.refresh(user)
         return user
 
+    @staticmethod
+    async def activate(session: AsyncSession, chat_id: int, user_chat_id: int,
+                       username: str | None, fullname: str | None) -> int | None:
+        """
+        Добавляет пользователя в группу или снова делает его активным.
+        Возвращает id пользователя или None, если группа не подключена
+        """
+        now = datetime.now()
+        source = select(
+            literal(user_chat_id, BigInteger),
+            Group.id,
+            literal(username),
+            literal(fullname or " "),
+            literal(True),
+            literal(now),
+            literal(now),
+        ).where(
+            Group.group_id == chat_id
+        )
+
+        stmt = insert(User).from_select(
+            [User.chat_id, User.group_id, User.username, User.fullname, User.is_active, User.created_at, User.updated_at],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="chat_in_group",
+            set_={
+                User.is_active: True,
+                User.updated_at: stmt.excluded.updated_at,
+            },
+        ).returning(User.id)
+
+        res = await session.execute(stmt)
+        return res.scalar_one_or_none()
+
+    @staticmethod
+    async def deactivate(session: AsyncSession, chat_id: int, user_chat_id: int) -> int | None:
+        """Возвращает id пользователя или None, если он не найден в группе"""
+        stmt = update(User).where(
+            and_(
+                User.group_id == Group.id,
+                Group.group_id == chat_id,
+                User.chat_id == user_chat_id,
+            )
+        ).values(
+            is_active=False,
+            updated_at=datetime.now(),
+        ).returning(User.id)
+
+        res = await session.execute(stmt)
+        return res.scalar_one_or_none()
+
     @staticmethod
     async def update(session: AsyncSession, user: User) -> User|None:
         user = await session.merge(user)
         await session.flush()
-        await session.refresh(user)
         return user
 
     @staticmethod
@@ -1,8 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.dto.dto import TelegramMessageDTO
-from dummy_bot.internal.models.models import User, Group
-from dummy_bot.internal.usecase.interfaces import IUOW, IGroupRepo, IUserRepo
+from dummy_bot.internal.usecase.interfaces import IUOW, IGroupRepo, IUserRepo, ILookupCache, ILeaderboardRepo, IReportCache
+from dummy_bot.internal.utils.tracing import traced
 
 
 class CommandsUseCase:
@@ -10,45 +10,44 @@ class CommandsUseCase:
             self,
             group_repo: IGroupRepo,
             user_repo: IUserRepo,
+            leaderboard_repo: ILeaderboardRepo,
+            lookup_cache: ILookupCache,
+            report_cache: IReportCache,
             uow: IUOW,
     ) -> None:
         self._group_repo: IGroupRepo = group_repo
         self._user_repo: IUserRepo = user_repo
+        self._leaderboard_repo: ILeaderboardRepo = leaderboard_repo
+        self._lookup_cache: ILookupCache = lookup_cache
+        self._report_cache: IReportCache = report_cache
         self._uow: IUOW = uow
 
+    @traced("CommandsUseCase.start")
     async def start(self, session: AsyncSession, dto: TelegramMessageDTO) -> None:
         async with self._uow.with_tx(session):
-            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
-            if group: return
+            await self._group_repo.insert_if_not_exists(session, dto.chat_id)
 
-            group = Group(group_id=dto.chat_id)
-            await self._group_repo.insert(session, group)
+        self._lookup_cache.invalidate_media(dto.chat_id)
 
+    @traced("CommandsUseCase.join")
     async def join(self, session: AsyncSession, dto: TelegramMessageDTO) -> None:
         async with self._uow.with_tx(session):
-            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
-            if not group: raise Exception()
+            user_id = await self._user_repo.activate(
+                session, dto.chat_id, dto.user_chat_id, dto.username, dto.fullname,
+            )
+            if not user_id: raise Exception()
 
-            user = await self._user_repo.get_by_group_and_user_chat_id(session, dto.user_chat_id, group)
-
-            if not user:
-                user = User(
-                    chat_id=dto.user_chat_id,
-                    group_id=group.id,
-                    username=dto.username,
-                    fullname=dto.fullname,
-                )
-
-            user.activate()
-            await self._user_repo.insert(session, user)
+        await self._invalidate_member(dto)
 
+    @traced("CommandsUseCase.leave")
     async def leave(self, session: AsyncSession, dto: TelegramMessageDTO) -> None:
         async with self._uow.with_tx(session):
-            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
-            if not group: raise Exception()
+            user_id = await self._user_repo.deactivate(session, dto.chat_id, dto.user_chat_id)
+            if not user_id: raise Exception()
 
-            user = await self._user_repo.get_by_group_and_user_chat_id(session, dto.user_chat_id, group)
-            if not user: raise Exception()
+        await self._invalidate_member(dto)
 
-            user.deactivate()
-            await self._user_repo.update(session, user)
+    async def _invalidate_member(self, dto: TelegramMessageDTO) -> None:
+        self._lookup_cache.invalidate_user(dto.chat_id, dto.user_chat_id)
+        self._report_cache.invalidate(dto.chat_id)
+        await self._leaderboard_repo.invalidate(dto.chat_id)
@@ -1,9 +1,10 @@
-from typing import Protocol, AsyncContextManager, List
+from typing import Protocol, AsyncContextManager, List, Any, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.models.models import User, Group, Media, Pokak
-from dummy_bot.internal.dto.dto import StatisticFilterDTO, UserStatInfoDTO
+from dummy_bot.internal.dto.dto import StatisticFilterDTO, UserStatInfoDTO, PokakRecordDTO
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
 
 
 class IUserRepo(Protocol):
@@ -13,12 +14,19 @@ class IUserRepo(Protocol):
 
     async def update(self, session: AsyncSession, user: User) -> User | None: ...
 
+    async def activate(self, session: AsyncSession, chat_id: int, user_chat_id: int,
+                       username: str | None, fullname: str | None) -> int | None: ...
+
+    async def deactivate(self, session: AsyncSession, chat_id: int, user_chat_id: int) -> int | None: ...
+
 
 class IGroupRepo(Protocol):
     async def get_by_chat_id(self, session: AsyncSession, chat_id: int) -> Group | None: ...
 
     async def insert(self, session: AsyncSession, group: Group) -> Group | None: ...
 
+    async def insert_if_not_exists(self, session: AsyncSession, chat_id: int) -> None: ...
+
     async def update(self, session: AsyncSession, group: Group) -> Group | None: ...
 
 
@@ -37,8 +45,48 @@ class IMediaRepo(Protocol):
 class IPokakRepo(Protocol):
     async def insert(self, session: AsyncSession, pokak: Pokak) -> Pokak: ...
 
+    async def insert_if_tracked(self, session: AsyncSession, chat_id: int, user_chat_id: int, media_unique_id: str) -> int | None: ...
+
+    async def insert_batch_if_tracked(self, session: AsyncSession, records: List[PokakRecordDTO]) -> List[Tuple[int, int]]: ...
+
+
+class IPokakBatchWriter(Protocol):
+    async def put(self, record: PokakRecordDTO) -> None: ...
+
+
+class ILeaderboardRepo(Protocol):
+    async def increment(self, chat_id: int, user_id: int) -> None: ...
+
+    async def top(self, chat_id: int, period: PeriodEnum, limit: int) -> List[UserStatInfoDTO] | None: ...
+
+    async def version(self, chat_id: int) -> int | None: ...
+
+    async def rebuild(self, chat_id: int, period: PeriodEnum, data: List[UserStatInfoDTO], version: int | None) -> bool: ...
+
+    async def invalidate(self, chat_id: int) -> None: ...
+
 
 class IUOW(Protocol):
     def with_tx(self, session: AsyncSession) -> AsyncContextManager[None]: ...
 
-    def readonly(self, session: AsyncSession) -> AsyncContextManager[None]: ...
\ No newline at end of file
+    def readonly(self, session: AsyncSession) -> AsyncContextManager[None]: ...
+
+    def snapshot(self, session: AsyncSession) -> AsyncContextManager[None]: ...
+
+
+class ILookupCache(Protocol):
+    def get_media(self, chat_id: int) -> Any: ...
+
+    def set_media(self, chat_id: int, media_unique_id: str | None) -> None: ...
+
+    def invalidate_media(self, chat_id: int) -> None: ...
+
+    def get_user_active(self, chat_id: int, user_chat_id: int) -> Any: ...
+
+    def set_user_active(self, chat_id: int, user_chat_id: int, is_active: bool) -> None: ...
+
+    def invalidate_user(self, chat_id: int, user_chat_id: int) -> None: ...
+
+
+class IReportCache(Protocol):
+    def invalidate(self, chat_id: int) -> None: ...
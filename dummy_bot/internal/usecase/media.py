@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from dummy_bot.internal.dto.dto import TelegramMessageDTO
 from dummy_bot.internal.models.models import Media
-from dummy_bot.internal.usecase.interfaces import IGroupRepo, IUOW, IMediaRepo
+from dummy_bot.internal.usecase.interfaces import IGroupRepo, IUOW, IMediaRepo, ILookupCache
+from dummy_bot.internal.utils.tracing import traced
 
 
 class MediaUseCase:
@@ -11,12 +12,15 @@ class MediaUseCase:
             self,
             group_repo: IGroupRepo,
             media_repo: IMediaRepo,
+            lookup_cache: ILookupCache,
             uow: IUOW,
     ) -> None:
         self._group_repo: IGroupRepo = group_repo
         self._media_repo: IMediaRepo = media_repo
+        self._lookup_cache: ILookupCache = lookup_cache
         self._uow: IUOW = uow
 
+    @traced("MediaUseCase.set_media")
     async def set_media(self, session: AsyncSession, dto: TelegramMessageDTO) -> None:
         async with self._uow.with_tx(session):
             if not dto.media_file_unique_id: raise
@@ -27,10 +31,11 @@ class MediaUseCase:
             media = await self._media_repo.get_by_group(session, group)
             if not media:
                 await self._insert_media(session, Media(group_id=group.id, media_unique_id=dto.media_file_unique_id))
-                return
+            else:
+                media.media_unique_id = dto.media_file_unique_id
+                await self._update_media(session, media)
 
-            media.media_unique_id = dto.media_file_unique_id
-            await self._update_media(session, media)
+        self._lookup_cache.invalidate_media(dto.chat_id)
 
     async def _insert_media(self, session: AsyncSession, media: Media) -> None:
         await self._media_repo.insert(session, media)
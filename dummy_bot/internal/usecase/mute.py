@@ -1,11 +1,13 @@
 from dummy_bot.internal.dto.dto import MuteResponseDTO, TelegramMessageDTO
 from dummy_bot.internal.utils.time_parser import TimeParser
+from dummy_bot.internal.utils.tracing import traced
 
 
 class MuteUseCase:
     def __init__(self, logger):
         self._logger = logger
 
+    @traced("MuteUseCase.mute")
     async def mute(self, dto: TelegramMessageDTO) -> MuteResponseDTO|None:
         _, dur, *reason = dto.text.split(" ")
         delta = TimeParser.parse_str_to_duration(dur)
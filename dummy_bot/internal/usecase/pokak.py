@@ -1,9 +1,12 @@
-from aiogram.types import Message
+from datetime import datetime
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from dummy_bot.internal.dto.dto import TelegramMessageDTO
-from dummy_bot.internal.models.models import Pokak
-from dummy_bot.internal.usecase.interfaces import IUserRepo, IGroupRepo, IMediaRepo, IUOW, IPokakRepo
+from dummy_bot.internal.dto.dto import TelegramMessageDTO, PokakRecordDTO
+from dummy_bot.internal.usecase.interfaces import IUserRepo, IGroupRepo, IMediaRepo, IUOW, IPokakRepo, ILookupCache, ILeaderboardRepo, IReportCache, IPokakBatchWriter
+from dummy_bot.internal.utils.ttl_cache import MISSING
+from dummy_bot.internal.utils.tracing import traced
 
 
 class PokakUseCase:
@@ -12,33 +15,75 @@ class PokakUseCase:
                  group_repo: IGroupRepo,
                  media_repo: IMediaRepo,
                  pokak_repo: IPokakRepo,
+                 leaderboard_repo: ILeaderboardRepo,
+                 lookup_cache: ILookupCache,
+                 report_cache: IReportCache,
                  uow: IUOW,
+                 batch_writer: Optional[IPokakBatchWriter] = None,
                  ) -> None:
         self._user_repo = user_repo
         self._group_repo = group_repo
         self._media_repo = media_repo
         self._pokak_repo = pokak_repo
+        self._leaderboard_repo = leaderboard_repo
+        self._lookup_cache = lookup_cache
+        self._report_cache = report_cache
         self._uow: IUOW = uow
+        self._batch_writer = batch_writer
 
+    @traced("PokakUseCase.add")
     async def add(self, session: AsyncSession, dto: TelegramMessageDTO) -> bool:
+        uid = dto.media_file_unique_id
+        if not uid:
+            return False
+
+        media_uid = self._lookup_cache.get_media(dto.chat_id)
+        if media_uid is MISSING:
+            media_uid = await self._load_media(session, dto)
+        if uid != media_uid:
+            return False
+
+        is_active = self._lookup_cache.get_user_active(dto.chat_id, dto.user_chat_id)
+        if is_active is MISSING:
+            is_active = await self._load_user_active(session, dto)
+        if not is_active:
+            return False
+
+        if self._batch_writer is not None:
+            # write-behind: окончательная проверка выполнится в пакетном INSERT
+            await self._batch_writer.put(PokakRecordDTO(dto.chat_id, dto.user_chat_id, uid, datetime.now()))
+            return True
+
         async with self._uow.with_tx(session):
-            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
-            if not group:
-                return False
+            user_id = await self._pokak_repo.insert_if_tracked(session, dto.chat_id, dto.user_chat_id, uid)
 
-            user = await self._user_repo.get_by_group_and_user_chat_id(session, dto.user_chat_id, group)
-            if not user or not user.is_active:
-                return False
+        if user_id is None:
+            return False
 
-            media = await self._media_repo.get_by_group(session, group)
-            if not media:
-                return False
+        self._report_cache.invalidate(dto.chat_id)
+        await self._leaderboard_repo.increment(dto.chat_id, user_id)
+        return True
 
-            uid = dto.media_file_unique_id
-            if not uid or uid != media.media_unique_id:
-                return False
+    async def _load_media(self, session: AsyncSession, dto: TelegramMessageDTO) -> str | None:
+        async with self._uow.readonly(session):
+            media_uid = None
 
-            await self._pokak_repo.insert(session, Pokak(user_id=user.id))
-            return True
+            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
+            if group:
+                media = await self._media_repo.get_by_group(session, group)
+                media_uid = media.media_unique_id if media else None
 
+        self._lookup_cache.set_media(dto.chat_id, media_uid)
+        return media_uid
+
+    async def _load_user_active(self, session: AsyncSession, dto: TelegramMessageDTO) -> bool:
+        async with self._uow.readonly(session):
+            is_active = False
+
+            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
+            if group:
+                user = await self._user_repo.get_by_group_and_user_chat_id(session, dto.user_chat_id, group)
+                is_active = bool(user and user.is_active)
 
+        self._lookup_cache.set_user_active(dto.chat_id, dto.user_chat_id, is_active)
+        return is_active
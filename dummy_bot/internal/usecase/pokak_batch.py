@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from dummy_bot.internal.dto.dto import PokakRecordDTO
+from dummy_bot.internal.usecase.interfaces import IUOW, IPokakRepo, ILeaderboardRepo, IReportCache
+
+_STOP = object()
+
+# serialization_failure, deadlock_detected: транзакция откатана сервером
+_RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+def _is_retryable(e: Exception) -> bool:
+    """Ошибка, после которой пачку можно записать заново: соединение, таймаут пула, конфликт транзакций"""
+    if isinstance(e, DBAPIError):
+        sqlstate = getattr(e.orig, "sqlstate", None) or getattr(e.orig, "pgcode", None)
+        return (
+            e.connection_invalidated
+            or sqlstate in _RETRYABLE_SQLSTATES
+            or isinstance(e, (OperationalError, InterfaceError))
+        )
+    return isinstance(e, (PoolTimeoutError, OSError, asyncio.TimeoutError))
+
+
+class PokakBatchWriter:
+    """
+    Write-behind запись покаков: проверенные по кэшу покаки копятся в очереди
+    и пишутся одним INSERT каждые flush_interval секунд или batch_size записей
+    """
+
+    def __init__(
+            self,
+            session_pool: async_sessionmaker,
+            pokak_repo: IPokakRepo,
+            leaderboard_repo: ILeaderboardRepo,
+            report_cache: IReportCache,
+            uow: IUOW,
+            batch_size: int = 100,
+            flush_interval: float = 0.05,
+            max_queue: int = 10_000,
+            retries: int = 3,
+    ) -> None:
+        self._session_pool = session_pool
+        self._pokak_repo = pokak_repo
+        self._leaderboard_repo = leaderboard_repo
+        self._report_cache = report_cache
+        self._uow: IUOW = uow
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._retries = retries
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, record: PokakRecordDTO) -> None:
+        await self._queue.put(record)
+
+    async def stop(self) -> None:
+        """Останавливает фоновую запись и дописывает всё, что осталось в очереди"""
+        if self._task is not None:
+            # сигнал в конце очереди: всё, что пришло раньше, будет записано фоновой задачей
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+
+        batch = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                batch.append(item)
+        for i in range(0, len(batch), self._batch_size):
+            await self._flush(batch[i:i + self._batch_size])
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self._flush_interval
+
+            while len(batch) < self._batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[PokakRecordDTO]) -> None:
+        for attempt in range(1, self._retries + 1):
+            committing = committed = False
+            try:
+                async with self._session_pool() as session:
+                    async with self._uow.with_tx(session):
+                        inserted = await self._pokak_repo.insert_batch_if_tracked(session, batch)
+                        committing = True
+                    committed = True
+                break
+            except Exception as e:
+                if committed:
+                    # пачка записана, упало закрытие сессии
+                    logging.warning(f"failed close session after flush: {e.__repr__()}")
+                    break
+
+                # ошибка на COMMIT: строки могли записаться, повтор задвоил бы покаки
+                if committing or not _is_retryable(e):
+                    self.dropped += len(batch)
+                    logging.error(f"failed flush {len(batch)} pokaks, not retried: {e.__repr__()}")
+                    return
+
+                logging.warning(f"failed flush pokaks (attempt {attempt}/{self._retries}): {e.__repr__()}")
+                await asyncio.sleep(self._flush_interval * attempt)
+        else:
+            self.dropped += len(batch)
+            logging.error(f"dropped {len(batch)} pokaks after {self._retries} attempts")
+            return
+
+        self.written += len(inserted)
+        for chat_id in {chat_id for chat_id, _ in inserted}:
+            self._report_cache.invalidate(chat_id)
+        for chat_id, user_id in inserted:
+            await self._leaderboard_repo.increment(chat_id, user_id)
@@ -1,7 +1,14 @@
+import logging
+from dataclasses import replace
+from typing import Callable, List, Optional
+
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from dummy_bot.internal.dto.dto import StatisticResponseDTO, StatisticFilterDTO, TelegramMessageDTO
-from dummy_bot.internal.usecase.interfaces import IGroupRepo, IStatisticsRepo, IUOW
+from dummy_bot.internal.dto.dto import StatisticResponseDTO, StatisticFilterDTO, TelegramMessageDTO, UserStatInfoDTO
+from dummy_bot.internal.usecase.interfaces import IGroupRepo, IStatisticsRepo, IUOW, ILeaderboardRepo
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+from dummy_bot.internal.utils.tracing import traced
 
 
 class StatisticsUseCase:
@@ -9,19 +16,62 @@ class StatisticsUseCase:
             self,
             group_repo: IGroupRepo,
             stat_repo: IStatisticsRepo,
+            leaderboard_repo: ILeaderboardRepo,
             uow: IUOW,
+            read_session_pool: Optional[Callable[[], AsyncSession]] = None,
     ) -> None:
         self._group_repo: IGroupRepo = group_repo
         self._stat_repo: IStatisticsRepo = stat_repo
+        self._leaderboard_repo: ILeaderboardRepo = leaderboard_repo
         self._uow: IUOW = uow
+        self._read_session_pool = read_session_pool
 
+    @traced("StatisticsUseCase.statistics")
     async def statistics(self, session: AsyncSession, dto: TelegramMessageDTO,
                          stat_filter: StatisticFilterDTO) -> StatisticResponseDTO:
 
-        async with self._uow.readonly(session):
-            group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
-            if not group: raise
+        if stat_filter.period is None:
+            return StatisticResponseDTO(await self._statistics_from_db(session, dto, stat_filter))
+
+        top = await self._leaderboard_repo.top(dto.chat_id, stat_filter.period, stat_filter.limit)
+        if top is not None:
+            return StatisticResponseDTO(top)
+
+        # версия до чтения БД: покак, записанный во время запроса, не потеряется в рейтинге
+        version = await self._leaderboard_repo.version(dto.chat_id)
+
+        # рейтинг строится по всем участникам, иначе последующие ZINCRBY исказят порядок.
+        # Только с primary: отстающая реплика может не видеть покак, уже учтённый в версии
+        res = await self._statistics_from_primary(session, dto, replace(stat_filter, limit=None))
+        await self._leaderboard_repo.rebuild(dto.chat_id, stat_filter.period, res, version)
+
+        return StatisticResponseDTO(res[:stat_filter.limit])
+
+    async def _statistics_from_db(self, session: AsyncSession, dto: TelegramMessageDTO,
+                                  stat_filter: StatisticFilterDTO) -> List[UserStatInfoDTO]:
+        if self._read_session_pool is None:
+            return await self._statistics_from_primary(session, dto, stat_filter)
+
+        try:
+            async with self._read_session_pool() as read_session:
+                # hot standby не поддерживает SERIALIZABLE, на реплике читаем в autocommit
+                async with self._uow.readonly(read_session):
+                    return await self._statistics(read_session, dto, stat_filter)
+        except (DBAPIError, OSError) as e:
+            logging.warning(f"failed read statistics from replica, fallback to primary: {e.__repr__()}")
+            return await self._statistics_from_primary(session, dto, stat_filter)
+
+    async def _statistics_from_primary(self, session: AsyncSession, dto: TelegramMessageDTO,
+                                       stat_filter: StatisticFilterDTO) -> List[UserStatInfoDTO]:
+        # за всё время - самый тяжёлый агрегат, читаем его из согласованного снимка
+        tx = self._uow.snapshot if stat_filter.period == PeriodEnum.ALL else self._uow.readonly
+
+        async with tx(session):
+            return await self._statistics(session, dto, stat_filter)
 
-            res = await self._stat_repo.statistics(session, group, stat_filter)
+    async def _statistics(self, session: AsyncSession, dto: TelegramMessageDTO,
+                          stat_filter: StatisticFilterDTO) -> List[UserStatInfoDTO]:
+        group = await self._group_repo.get_by_chat_id(session, dto.chat_id)
+        if not group: raise
 
-            return StatisticResponseDTO(res)
+        return await self._stat_repo.statistics(session, group, stat_filter)
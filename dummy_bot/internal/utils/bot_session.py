@@ -0,0 +1,86 @@
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer, PRODUCTION
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiohttp import ClientSession, ClientTimeout, TraceConfig
+
+from dummy_bot.internal.utils.metrics import Counter, REGISTRY
+
+HTTP_CONNECTIONS = REGISTRY.register(Counter(
+    "bot_http_connections_total", "Bot API HTTP connections by kind: new (TCP+TLS handshake) or reused", ("kind",),
+))
+HTTP_DNS_LOOKUPS = REGISTRY.register(Counter(
+    "bot_http_dns_lookups_total", "Bot API DNS lookups by DNS cache result", ("result",),
+))
+
+
+def connection_reuse_ratio() -> float:
+    """Доля запросов, ушедших по уже открытому keep-alive соединению"""
+    new = HTTP_CONNECTIONS.value("new")
+    reused = HTTP_CONNECTIONS.value("reused")
+    return reused / (new + reused) if new + reused else 0.0
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """
+    AiohttpSession с настраиваемым пулом keep-alive соединений, кэшем DNS и таймаутом
+    подключения; считает новые и переиспользованные соединения
+    """
+
+    def __init__(
+            self,
+            limit: int = 100,
+            keepalive_timeout: float = 60,
+            dns_cache_ttl: int = 3600,
+            connect_timeout: float = 5,
+            timeout: float = 60,
+            api: TelegramAPIServer = PRODUCTION,
+            **kwargs: Any,
+    ) -> None:
+        super().__init__(limit=limit, timeout=timeout, api=api, **kwargs)
+        self._connector_init.update({
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": dns_cache_ttl,
+        })
+        self._connect_timeout = connect_timeout
+
+        self._trace_config = TraceConfig()
+        self._trace_config.on_connection_create_end.append(_on_connection_created)
+        self._trace_config.on_connection_reuseconn.append(_on_connection_reused)
+        self._trace_config.on_dns_cache_hit.append(_on_dns_cache_hit)
+        self._trace_config.on_dns_cache_miss.append(_on_dns_cache_miss)
+        self._trace_config.freeze()
+
+    async def create_session(self) -> ClientSession:
+        session = await super().create_session()
+        if self._trace_config not in session.trace_configs:
+            session.trace_configs.append(self._trace_config)
+        return session
+
+    async def make_request(
+            self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        # число aiohttp превращает в ClientTimeout(total=...), теряя таймаут подключения
+        total = self.timeout if timeout is None else timeout
+        return await super().make_request(
+            bot, method, timeout=ClientTimeout(total=total, connect=self._connect_timeout),
+        )
+
+
+async def _on_connection_created(session, context, params) -> None:
+    HTTP_CONNECTIONS.inc("new")
+
+
+async def _on_connection_reused(session, context, params) -> None:
+    HTTP_CONNECTIONS.inc("reused")
+
+
+async def _on_dns_cache_hit(session, context, params) -> None:
+    HTTP_DNS_LOOKUPS.inc("hit")
+
+
+async def _on_dns_cache_miss(session, context, params) -> None:
+    HTTP_DNS_LOOKUPS.inc("miss")
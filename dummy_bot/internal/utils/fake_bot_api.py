@@ -0,0 +1,23 @@
+import asyncio
+
+from aiohttp import web
+
+
+async def start_fake_api(host: str, port: int, latency: float = 0.0, close: bool = False) -> web.AppRunner:
+    """
+    Локальный Bot API для бенчмарков и тестов: на любой метод отвечает ok после задержки latency.
+    close - закрывать соединение после каждого ответа (без keep-alive)
+    """
+
+    async def handle(_: web.Request) -> web.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        return web.json_response({"ok": True, "result": True}, headers={"Connection": "close"} if close else None)
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,36 @@
+from typing import Any, Dict
+
+from dummy_bot.internal.utils.ttl_cache import TTLCache
+
+
+class LookupCache:
+    """Кэш редко меняющихся данных группы: медиа покака и активность участников"""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300) -> None:
+        self.__media = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.__users = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get_media(self, chat_id: int) -> Any:
+        return self.__media.get(chat_id)
+
+    def set_media(self, chat_id: int, media_unique_id: str | None) -> None:
+        self.__media.set(chat_id, media_unique_id)
+
+    def invalidate_media(self, chat_id: int) -> None:
+        self.__media.invalidate(chat_id)
+
+    def get_user_active(self, chat_id: int, user_chat_id: int) -> Any:
+        return self.__users.get((chat_id, user_chat_id))
+
+    def set_user_active(self, chat_id: int, user_chat_id: int, is_active: bool) -> None:
+        self.__users.set((chat_id, user_chat_id), is_active)
+
+    def invalidate_user(self, chat_id: int, user_chat_id: int) -> None:
+        self.__users.invalidate((chat_id, user_chat_id))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "media": self.__media.stats(),
+            "users": self.__users.stats(),
+        }
+
@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+import heapq
+import inspect
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Awaitable, Dict, List, Optional, Set, Tuple
+
+from dummy_bot.internal.utils.tracing import TRACER, Span
+
+
+class Priority(IntEnum):
+    MODERATION = 0
+    NORMAL = 1
+    REACTION = 2
+
+
+class TokenBucket:
+    """
+    Token bucket с очередью ожидающих по приоритету:
+    при нехватке токенов первым получает токен ожидающий с меньшим Priority
+    """
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._seq = itertools.count()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return not self._waiters and self._tokens >= self.burst and self._paused_until <= time.monotonic()
+
+    async def acquire(self, priority: Priority = Priority.NORMAL) -> None:
+        self._refill()
+        if not self._waiters and self._tokens >= 1 and self._paused_until <= time.monotonic():
+            self._tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        await future
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены seconds секунд, например после 429 с retry_after"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._schedule()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _schedule(self) -> None:
+        if self._wakeup is not None or not self._waiters:
+            return
+
+        self._refill()
+        now = time.monotonic()
+        delay = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        self._wakeup = None
+        self._refill()
+
+        while self._waiters and self._tokens >= 1 and self._paused_until <= time.monotonic():
+            _, _, future = heapq.heappop(self._waiters)
+            # отменённый ожидающий токен не тратит
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+
+        self._schedule()
+
+
+class OutboundScheduler:
+    """
+    Ограничение исходящих запросов к Bot API: общий bucket на бота и bucket на чат.
+    Лимиты на процесс: при нескольких воркерах global_rate делится между ними
+    """
+
+    def __init__(
+            self,
+            global_rate: float = 30,
+            group_rate: float = 20 / 60,
+            private_rate: float = 1,
+            chat_burst: float = 5,
+            max_chats: int = 10_000,
+            max_background_per_chat: int = 50,
+    ) -> None:
+        self._global = TokenBucket(global_rate, global_rate)
+        self._group_rate = group_rate
+        self._private_rate = private_rate
+        self._chat_burst = chat_burst
+        self._max_chats = max_chats
+        self._chats: Dict[int | str, TokenBucket] = {}
+        # фоновые запросы по чатам: лимит на чат, чтобы флуд в одном чате не вытеснял остальные
+        self._background: Dict[int | str | None, Set[asyncio.Task]] = {}
+        self._max_background_per_chat = max_background_per_chat
+        self.dropped = 0
+
+    async def acquire(self, chat_id: int | str | None, priority: Priority = Priority.NORMAL) -> None:
+        if chat_id is not None:
+            await self._chat_bucket(chat_id).acquire(priority)
+        await self._global.acquire(priority)
+
+    def pause(self, chat_id: int | str | None, seconds: float) -> None:
+        if chat_id is None:
+            self._global.pause(seconds)
+        else:
+            self._chat_bucket(chat_id).pause(seconds)
+
+    def spawn(self, request: Awaitable, chat_id: int | str | None) -> None:
+        """
+        Fire-and-forget запрос: хендлер не ждёт ответа Telegram, ошибки только логируются.
+        Если у чата слишком много фоновых запросов (чат упёрся в лимит), новый отбрасывается
+        """
+        tasks = self._background.setdefault(chat_id, set())
+        if len(tasks) >= self._max_background_per_chat:
+            self.dropped += 1
+            # корутина так и не запущена: закрываем, иначе "coroutine was never awaited"
+            if inspect.iscoroutine(request):
+                request.close()
+            return
+
+        # свой контекст: спаны хендлера уже закрыты и экспортированы, когда запрос выполнится,
+        # поэтому у фонового запроса свой корневой спан со ссылкой на спан хендлера
+        task = asyncio.get_running_loop().create_task(
+            self._run_background(request, TRACER.current_span()), context=contextvars.Context(),
+        )
+        tasks.add(task)
+        task.add_done_callback(lambda done: self._background_done(chat_id, done))
+
+    async def drain(self, timeout: float = 10) -> None:
+        """Дожидается фоновых запросов при остановке, не дождавшиеся за timeout отменяются"""
+        background = {task for tasks in self._background.values() for task in tasks}
+        if not background:
+            return
+
+        _, pending = await asyncio.wait(background, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logging.warning(f"cancelled {len(pending)} background telegram requests on shutdown")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    async def _run_background(request: Awaitable, link: Optional[Span]) -> None:
+        # хендлер не попал в выборку трейсов - фоновый запрос тоже без спанов
+        if link is None:
+            await request
+            return
+
+        with TRACER.span("outbound.background", root=True, link=link):
+            await request
+
+    def _background_done(self, chat_id: int | str | None, task: asyncio.Task) -> None:
+        tasks = self._background.get(chat_id)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self._background[chat_id]
+
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"failed background telegram request: {task.exception().__repr__()}")
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self._max_chats:
+                self._chats = {key: value for key, value in self._chats.items() if not value.idle}
+
+            # в группах (и каналах по @username) лимит ниже, чем в личке
+            private = isinstance(chat_id, int) and chat_id > 0
+            bucket = TokenBucket(self._private_rate if private else self._group_rate, self._chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+from dummy_bot.internal.utils.ttl_cache import TTLCache, MISSING
+
+
+class ReportCache:
+    """Готовые тексты отчётов по (группа, период, начало периода)"""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 600) -> None:
+        self.__reports = TTLCache(maxsize=maxsize, ttl=ttl)
+        # номер последней инвалидации группы; отчёт, посчитанный до неё, в кэш не попадёт
+        self.__generation = 0
+        self.__invalidated: OrderedDict[int, int] = OrderedDict()
+        self.__invalidated_maxsize = maxsize
+        # самая поздняя забытая инвалидация: для групп без записи считаем, что она была их
+        self.__forgotten = 0
+
+    def get(self, chat_id: int, period: PeriodEnum) -> Tuple[str | None, int]:
+        """Отчёт и текущее поколение - его передают в set вместе с посчитанным отчётом"""
+        report = self.__reports.get(self._key(chat_id, period))
+        return None if report is MISSING else report, self.__generation
+
+    def set(self, chat_id: int, period: PeriodEnum, report: str, generation: int) -> bool:
+        if self.__invalidated.get(chat_id, self.__forgotten) > generation:
+            return False
+
+        self.__reports.set(self._key(chat_id, period), report)
+        return True
+
+    def invalidate(self, chat_id: int) -> None:
+        self.__generation += 1
+        self.__invalidated[chat_id] = self.__generation
+        self.__invalidated.move_to_end(chat_id)
+        while len(self.__invalidated) > self.__invalidated_maxsize:
+            _, forgotten = self.__invalidated.popitem(last=False)
+            self.__forgotten = max(self.__forgotten, forgotten)
+
+        for period in PeriodEnum:
+            self.__reports.invalidate(self._key(chat_id, period))
+
+    def stats(self) -> Dict[str, int]:
+        return self.__reports.stats()
+
+    @staticmethod
+    def _key(chat_id: int, period: PeriodEnum) -> tuple:
+        start, _ = period.get_date_scope()
+        return chat_id, period, start
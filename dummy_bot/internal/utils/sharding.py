@@ -0,0 +1,12 @@
+def shard_for(chat_id: int, shards: int) -> int:
+    """
+    Jump consistent hash: номер шарда для чата.
+    При изменении числа шардов переезжает только ~1/shards чатов
+    """
+    key = chat_id & 0xFFFFFFFFFFFFFFFF
+    b, j = -1, 0
+    while j < shards:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
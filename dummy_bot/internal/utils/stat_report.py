@@ -31,12 +31,11 @@ class ReportStat:
                 return f"{header} за всё время:"
 
     def _body(self) -> str:
-        self.data = sorted(self.data, key=lambda x: x.count, reverse=True)
-
+        # данные уже отсортированы по убыванию в статистике
         lines = [
             self.__format_line(num, data)
-            for num, data in enumerate(self.data, 1)
-        ][:self.limit]
+            for num, data in enumerate(self.data[:self.limit], 1)
+        ]
 
         return "\n".join(lines)
 
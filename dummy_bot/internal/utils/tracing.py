@@ -0,0 +1,205 @@
+import collections
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Protocol
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    duration: float = 0.0
+    status: str = "ok"
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _started_at: float = field(default=0.0, repr=False)
+    # все завершённые спаны трейса, общий список для корня и детей
+    _trace: List["Span"] = field(default_factory=list, repr=False)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class ISpanExporter(Protocol):
+    def export(self, spans: List[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemorySpanExporter:
+    """Последние трейсы в памяти процесса - для отладки и тестов"""
+
+    def __init__(self, maxlen: int = 1000) -> None:
+        self.traces: Deque[List[Span]] = collections.deque(maxlen=maxlen)
+
+    def export(self, spans: List[Span]) -> None:
+        self.traces.append(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """Спаны в файл JSON lines; запись в отдельном потоке, при переполнении очереди трейс отбрасывается"""
+
+    def __init__(self, path: str, queue_size: int = 10_000) -> None:
+        self._path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        with open(self._path, "a", encoding="utf-8") as f:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    return
+                try:
+                    f.writelines(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+                    f.flush()
+                except Exception as e:
+                    logging.warning(f"failed write spans: {e.__repr__()}")
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Трейсинг в стиле OpenTelemetry: корневой спан на апдейт, дочерние - на middleware,
+    use case, SQL и запросы к Bot API. Текущий спан передаётся через contextvars.
+    Без экспортера все спаны - no-op
+    """
+
+    def __init__(self) -> None:
+        self._exporter: Optional[ISpanExporter] = None
+        self._sample_rate = 1.0
+
+    def configure(self, exporter: Optional[ISpanExporter], sample_rate: float = 1.0) -> None:
+        self._exporter = exporter
+        self._sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self._exporter is not None
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(self, name: str, root: bool = False, link: Optional[Span] = None, **attributes: Any) -> Optional[Span]:
+        """
+        Дочерний спан текущего; корневой - только при root=True и попадании в выборку.
+        link - спан, породивший фоновую работу: корень со ссылкой на него попадает в выборку вместе с ним
+        """
+        if self._exporter is None:
+            return None
+
+        parent = _current_span.get()
+        if parent is None:
+            if not root or (link is None and random.random() >= self._sample_rate):
+                return None
+            trace_id, parent_id, trace = os.urandom(16).hex(), None, []
+            if link is not None:
+                attributes = {**attributes, "link.trace_id": link.trace_id, "link.span_id": link.span_id}
+        else:
+            trace_id, parent_id, trace = parent.trace_id, parent.span_id, parent._trace
+
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent_id,
+            start_time=time.time(),
+            attributes=attributes,
+            _started_at=time.perf_counter(),
+            _trace=trace,
+        )
+
+    def end_span(self, span: Optional[Span], error: Optional[BaseException] = None) -> None:
+        if span is None:
+            return
+
+        span.duration = time.perf_counter() - span._started_at
+        if error is not None:
+            span.status = "error"
+            span.error = error.__repr__()
+        span._trace.append(span)
+
+        if span.parent_id is None:
+            try:
+                self._exporter.export(span._trace)
+            except Exception as e:
+                logging.warning(f"failed export spans: {e.__repr__()}")
+
+    @contextmanager
+    def span(self, name: str, root: bool = False, link: Optional[Span] = None,
+             **attributes: Any) -> Iterator[Optional[Span]]:
+        span = self.start_span(name, root=root, link=link, **attributes)
+        if span is None:
+            yield None
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            _current_span.reset(token)
+
+    def shutdown(self) -> None:
+        if self._exporter is not None:
+            self._exporter.shutdown()
+
+
+TRACER = Tracer()
+
+
+def traced(name: str) -> Callable:
+    """Спан на вызов async-функции"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,49 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        item = self.__data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self.__data[key]
+            self.misses += 1
+            return MISSING
+
+        self.__data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.__data[key] = (time.monotonic() + self.ttl, value)
+        self.__data.move_to_end(key)
+        while len(self.__data) > self.maxsize:
+            self.__data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.__data.pop(key, None)
+
+    def clear(self) -> None:
+        self.__data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.__data),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self.__data)
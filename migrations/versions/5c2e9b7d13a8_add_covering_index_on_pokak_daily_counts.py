@@ -0,0 +1,28 @@
+"""add covering index on pokak daily counts
+
+Revision ID: 5c2e9b7d13a8
+Revises: 8d5e0a7c41f2
+Create Date: 2026-10-18 14:37:09.651382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e9b7d13a8'
+down_revision: Union[str, None] = '8d5e0a7c41f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # count в INCLUDE: статистика за год и за всё время читается index only scan,
+    # без случайных чтений строк счётчиков из heap
+    op.create_index('ix_pokak_daily_counts_user_id_day', 'pokak_daily_counts', ['user_id', 'day'],
+                    unique=False, postgresql_include=['count'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pokak_daily_counts_user_id_day', table_name='pokak_daily_counts')
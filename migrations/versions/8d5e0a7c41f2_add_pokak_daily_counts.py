@@ -0,0 +1,63 @@
+"""add pokak daily counts
+
+Revision ID: 8d5e0a7c41f2
+Revises: 3b8f1c2d9a47
+Create Date: 2026-10-18 11:03:17.589203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '8d5e0a7c41f2'
+down_revision: Union[str, None] = '3b8f1c2d9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('pokak_daily_counts',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('day', sa.Date(), nullable=False),
+                    sa.Column('count', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+                    sa.PrimaryKeyConstraint('user_id', 'day', name='pokak_daily_count_id')
+                    )
+
+    op.execute("""
+        CREATE FUNCTION pokak_daily_counts_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO pokak_daily_counts (user_id, day, count)
+                VALUES (NEW.user_id, NEW.created_at::date, 1)
+                ON CONFLICT (user_id, day) DO UPDATE SET count = pokak_daily_counts.count + 1;
+                RETURN NEW;
+            END IF;
+
+            UPDATE pokak_daily_counts SET count = count - 1
+            WHERE user_id = OLD.user_id AND day = OLD.created_at::date;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER pokaks_daily_counts_sync
+        AFTER INSERT OR DELETE ON pokaks
+        FOR EACH ROW EXECUTE FUNCTION pokak_daily_counts_sync()
+    """)
+
+    # backfill: триггер уже держит блокировку pokaks до конца транзакции
+    op.execute("""
+        INSERT INTO pokak_daily_counts (user_id, day, count)
+        SELECT user_id, created_at::date, count(*)
+        FROM pokaks
+        GROUP BY user_id, created_at::date
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER pokaks_daily_counts_sync ON pokaks")
+    op.execute("DROP FUNCTION pokak_daily_counts_sync()")
+    op.drop_table('pokak_daily_counts')
@@ -0,0 +1,25 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+import pytest
+
+from dummy_bot.internal.utils.fake_bot_api import start_fake_api
+
+
+@pytest.fixture
+def fake_bot_api() -> Callable[..., AsyncIterator[str]]:
+    """
+    Фабрика локального Bot API: `async with fake_bot_api(latency=...) as url`.
+    Сервер запускается в цикле событий теста и слушает свободный порт
+    """
+
+    @asynccontextmanager
+    async def run(latency: float = 0.0, close: bool = False) -> AsyncIterator[str]:
+        runner = await start_fake_api("127.0.0.1", 0, latency=latency, close=close)
+        try:
+            host, port = runner.addresses[0][:2]
+            yield f"http://{host}:{port}"
+        finally:
+            await runner.cleanup()
+
+    return run
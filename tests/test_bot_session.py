@@ -0,0 +1,74 @@
+import asyncio
+from typing import List
+
+from aiogram import Bot
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import ClientSession, ClientTimeout
+
+from dummy_bot.internal.utils.bot_session import HTTP_CONNECTIONS, TunedAiohttpSession
+
+TOKEN = "42:test"
+CALLS = 5
+
+
+async def _call(api_url: str, times: int, **session_kwargs) -> None:
+    session = TunedAiohttpSession(api=TelegramAPIServer.from_base(api_url), **session_kwargs)
+    bot = Bot(TOKEN, session=session)
+    try:
+        for _ in range(times):
+            assert await bot.delete_message(chat_id=1, message_id=1) is True
+    finally:
+        await session.close()
+
+
+def _connections() -> tuple:
+    return HTTP_CONNECTIONS.value("new"), HTTP_CONNECTIONS.value("reused")
+
+
+def test_sequential_calls_reuse_connection(fake_bot_api):
+    async def run():
+        async with fake_bot_api() as url:
+            await _call(url, CALLS)
+
+    new_before, reused_before = _connections()
+    asyncio.run(run())
+    new, reused = _connections()
+
+    # одно TCP-соединение на все последовательные вызовы
+    assert (new - new_before, reused - reused_before) == (1, CALLS - 1)
+
+
+def test_connection_not_reused_without_keepalive(fake_bot_api):
+    async def run():
+        async with fake_bot_api(close=True) as url:
+            await _call(url, CALLS)
+
+    new_before, reused_before = _connections()
+    asyncio.run(run())
+    new, reused = _connections()
+
+    assert (new - new_before, reused - reused_before) == (CALLS, 0)
+
+
+def test_connect_timeout_reaches_aiohttp(fake_bot_api, monkeypatch):
+    timeouts: List[ClientTimeout] = []
+    request = ClientSession._request
+
+    def capture(self, method, url, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        return request(self, method, url, **kwargs)
+
+    monkeypatch.setattr(ClientSession, "_request", capture)
+
+    async def run():
+        async with fake_bot_api() as url:
+            session = TunedAiohttpSession(api=TelegramAPIServer.from_base(url), connect_timeout=2, timeout=30)
+            bot = Bot(TOKEN, session=session)
+            try:
+                await bot.delete_message(chat_id=1, message_id=1)
+                await bot.delete_message(chat_id=1, message_id=1, request_timeout=7)
+            finally:
+                await session.close()
+
+    asyncio.run(run())
+    assert [(t.total, t.connect) for t in timeouts] == [(30, 2), (7, 2)]
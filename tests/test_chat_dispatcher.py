@@ -0,0 +1,89 @@
+import asyncio
+from typing import List, Tuple
+
+from dummy_bot.internal.app.chat_dispatcher import ChatDispatcher
+
+NOISY, QUIET = -1, -2
+
+
+def test_waiting_chat_does_not_block_others():
+    async def run():
+        release = asyncio.Event()
+        done: List[Tuple[str, str]] = []
+
+        async def process(entry_id: str, payload: str) -> None:
+            # шумный чат упёрся в лимит Bot API
+            if payload == "noisy":
+                await release.wait()
+            done.append((entry_id, payload))
+
+        chats = ChatDispatcher(process)
+        await chats.dispatch(NOISY, "1", "noisy")
+        await chats.dispatch(NOISY, "2", "noisy-next")
+        await chats.dispatch(QUIET, "3", "quiet")
+        await asyncio.sleep(0.01)
+        before_release = list(done)
+
+        release.set()
+        await chats.join()
+        return before_release, done
+
+    before_release, done = asyncio.run(run())
+    assert before_release == [("3", "quiet")]
+    # внутри чата порядок сохранён
+    assert done[1:] == [("1", "noisy"), ("2", "noisy-next")]
+
+
+def test_inflight_is_bounded():
+    async def run():
+        release = asyncio.Event()
+
+        async def process(entry_id: str, payload: str) -> None:
+            await release.wait()
+
+        chats = ChatDispatcher(process, max_inflight=2)
+        await chats.dispatch(NOISY, "1", "")
+        await chats.dispatch(QUIET, "2", "")
+
+        third = asyncio.create_task(chats.dispatch(NOISY, "3", ""))
+        await asyncio.sleep(0.01)
+        blocked = not third.done()
+
+        release.set()
+        await third
+        await chats.join()
+        return blocked
+
+    assert asyncio.run(run())
+
+
+def test_failed_update_does_not_stop_chat():
+    async def run():
+        done = []
+
+        async def process(entry_id: str, payload: str) -> None:
+            if entry_id == "1":
+                raise ConnectionError("ack failed")
+            done.append(entry_id)
+
+        chats = ChatDispatcher(process)
+        await chats.dispatch(NOISY, "1", "")
+        await chats.dispatch(NOISY, "2", "")
+        await chats.join()
+        return done
+
+    assert asyncio.run(run()) == ["2"]
+
+
+def test_cancel_stops_processing():
+    async def run():
+        async def process(entry_id: str, payload: str) -> None:
+            await asyncio.sleep(10)
+
+        chats = ChatDispatcher(process)
+        await chats.dispatch(NOISY, "1", "")
+        await asyncio.sleep(0)
+        await asyncio.wait_for(chats.cancel(), 1)
+        await chats.join()
+
+    asyncio.run(run())
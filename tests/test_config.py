@@ -0,0 +1,40 @@
+import pytest
+
+from dummy_bot.config.config import AppConfig
+
+
+@pytest.fixture(autouse=True)
+def env(monkeypatch):
+    for key in ("BOT_MODE", "BOT_ROLE", "BOT_SHARDS", "BOT_WORKER_SHARDS", "BOT_WORKER_INDEX", "BOT_WORKERS"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("TG_TOKEN", "42:test")
+    monkeypatch.setenv("BOT_SHARDS", "5")
+    return monkeypatch
+
+
+def test_worker_requires_shards(env):
+    env.setenv("BOT_ROLE", "worker")
+    with pytest.raises(ValueError, match="BOT_WORKER_SHARDS or BOT_WORKER_INDEX"):
+        AppConfig()
+
+
+def test_worker_explicit_shards(env):
+    env.setenv("BOT_ROLE", "worker")
+    env.setenv("BOT_WORKER_SHARDS", "3,1")
+    assert AppConfig().worker_shards == [1, 3]
+
+
+def test_worker_shards_by_index(env):
+    env.setenv("BOT_ROLE", "worker")
+    env.setenv("BOT_WORKERS", "2")
+    env.setenv("BOT_WORKER_INDEX", "1")
+    assert AppConfig().worker_shards == [1, 3]
+
+
+def test_worker_index_out_of_range(env):
+    env.setenv("BOT_ROLE", "worker")
+    env.setenv("BOT_WORKERS", "2")
+    env.setenv("BOT_WORKER_INDEX", "2")
+    with pytest.raises(ValueError, match="Worker index"):
+        AppConfig()
+
@@ -0,0 +1,81 @@
+import asyncio
+
+from fakeredis import FakeAsyncRedis
+from redis.asyncio import Redis
+
+from dummy_bot.internal.dto.dto import UserStatInfoDTO
+from dummy_bot.internal.repository.leaderboard import LeaderboardRepository
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+
+CHAT_ID = -100
+
+
+class Cache:
+    def __init__(self) -> None:
+        self.client: Redis = FakeAsyncRedis(decode_responses=True)
+
+    def key(self, key: str) -> str:
+        return f"3:{key}"
+
+
+def _row(user_id: int, count: int) -> UserStatInfoDTO:
+    return UserStatInfoDTO(user_id, f"user{user_id}", f"User {user_id}", count)
+
+
+def test_keys_are_prefixed():
+    async def run():
+        cache = Cache()
+        repo = LeaderboardRepository(cache)
+        assert await repo.rebuild(CHAT_ID, PeriodEnum.ALL, [_row(1, 2)], await repo.version(CHAT_ID))
+        await repo.increment(CHAT_ID, 1)
+        return await cache.client.keys("*")
+
+    keys = asyncio.run(run())
+    assert keys and all(key.startswith("3:leaderboard:") for key in keys)
+
+
+def test_empty_group_is_cached():
+    async def run():
+        repo = LeaderboardRepository(Cache())
+        before = await repo.top(CHAT_ID, PeriodEnum.WEEK, 10)
+        assert await repo.rebuild(CHAT_ID, PeriodEnum.WEEK, [], await repo.version(CHAT_ID))
+        return before, await repo.top(CHAT_ID, PeriodEnum.WEEK, 10)
+
+    before, after = asyncio.run(run())
+    assert before is None
+    assert after == []
+
+
+def test_increment_after_rebuild():
+    async def run():
+        repo = LeaderboardRepository(Cache())
+        await repo.rebuild(CHAT_ID, PeriodEnum.ALL, [_row(1, 2), _row(2, 1)], await repo.version(CHAT_ID))
+        await repo.increment(CHAT_ID, 2)
+        await repo.increment(CHAT_ID, 2)
+        return await repo.top(CHAT_ID, PeriodEnum.ALL, 1)
+
+    assert asyncio.run(run()) == [_row(2, 3)]
+
+
+def test_rebuild_skipped_after_concurrent_increment():
+    async def run():
+        repo = LeaderboardRepository(Cache())
+        version = await repo.version(CHAT_ID)
+        # покак записан в БД и в redis, пока статистика читала БД без него
+        await repo.increment(CHAT_ID, 1)
+        written = await repo.rebuild(CHAT_ID, PeriodEnum.ALL, [_row(1, 2)], version)
+        return written, await repo.top(CHAT_ID, PeriodEnum.ALL, 10)
+
+    written, top = asyncio.run(run())
+    assert not written
+    assert top is None
+
+
+def test_rebuild_skipped_after_invalidate():
+    async def run():
+        repo = LeaderboardRepository(Cache())
+        version = await repo.version(CHAT_ID)
+        await repo.invalidate(CHAT_ID)
+        return await repo.rebuild(CHAT_ID, PeriodEnum.ALL, [_row(1, 2)], version)
+
+    assert not asyncio.run(run())
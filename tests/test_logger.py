@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+from dummy_bot.internal.logger import logger
+from dummy_bot.internal.logger.logger import fast_json_dumps, json_dumps, json_encoder_name
+
+
+def test_fast_json_dumps_with_orjson():
+    pytest.importorskip("orjson")
+
+    assert json_encoder_name(fast_json_dumps) == "orjson"
+    assert json.loads(fast_json_dumps({"message": "покак", "at": object})) == {"message": "покак", "at": str(object)}
+
+
+def test_fast_json_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(logger, "orjson", None)
+
+    assert json_encoder_name(fast_json_dumps) == "json"
+    assert fast_json_dumps({"a": 1}) == json_dumps({"a": 1})
+
+
+def test_json_dumps_is_reported_as_json():
+    assert json_encoder_name(json_dumps) == "json"
@@ -0,0 +1,120 @@
+import math
+import re
+
+from dummy_bot.internal.utils.metrics import Counter, GaugeCallback, Histogram, Registry
+
+# строка с сэмплом в текстовом формате экспозиции Prometheus 0.0.4
+SAMPLE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\n"])*"(,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\n"])*")*\})?'
+    r' (NaN|[+-]Inf|-?[0-9]+(\.[0-9]+)?(e[+-]?[0-9]+)?)$'
+)
+
+
+def _render(*metrics) -> str:
+    registry = Registry()
+    for metric in metrics:
+        registry.register(metric)
+    return registry.render()
+
+
+def _assert_valid(text: str) -> None:
+    assert text.endswith("\n")
+    for line in text.rstrip("\n").split("\n"):
+        if line.startswith("# "):
+            assert re.match(r"^# (HELP|TYPE) [a-zA-Z_:][a-zA-Z0-9_:]* ", line), line
+        else:
+            assert SAMPLE.match(line), line
+
+
+def test_counter():
+    counter = Counter("bot_calls_total", "Calls by handler", ("handler", "status"))
+    counter.inc("start", "success")
+    counter.inc("start", "success")
+    counter.inc("join", "error", amount=0.5)
+
+    text = _render(counter)
+    _assert_valid(text)
+    assert text == (
+        "# HELP bot_calls_total Calls by handler\n"
+        "# TYPE bot_calls_total counter\n"
+        'bot_calls_total{handler="join",status="error"} 0.5\n'
+        'bot_calls_total{handler="start",status="success"} 2\n'
+    )
+
+
+def test_counter_without_labels():
+    counter = Counter("bot_updates_total", "Updates")
+    counter.inc()
+
+    assert _render(counter).splitlines()[-1] == "bot_updates_total 1"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("bot_duration_seconds", "Duration", ("handler",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, "start")
+
+    text = _render(histogram)
+    _assert_valid(text)
+    assert text.splitlines()[2:] == [
+        # граница бакета включительно: 0.1 попадает в le="0.1"
+        'bot_duration_seconds_bucket{handler="start",le="0.1"} 2',
+        'bot_duration_seconds_bucket{handler="start",le="1"} 3',
+        'bot_duration_seconds_bucket{handler="start",le="+Inf"} 4',
+        'bot_duration_seconds_sum{handler="start"} 3.65',
+        'bot_duration_seconds_count{handler="start"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("bot_errors_total", "Errors", ("error",))
+    counter.inc('say "hi"\\\n')
+
+    text = _render(counter)
+    _assert_valid(text)
+    assert text.splitlines()[-1] == 'bot_errors_total{error="say \\"hi\\"\\\\\\n"} 1'
+
+
+def test_help_is_escaped():
+    counter = Counter("bot_calls_total", 'Calls "per"\nhandler \\ status')
+
+    assert _render(counter).splitlines()[0] == '# HELP bot_calls_total Calls "per"\\nhandler \\\\ status'
+
+
+def test_gauge_special_values():
+    gauge = GaugeCallback("bot_pool", "Pool state", ("state",), lambda: {
+        ("nan",): math.nan, ("inf",): math.inf, ("negative",): -math.inf, ("size",): 10.0,
+    })
+
+    text = _render(gauge)
+    _assert_valid(text)
+    assert text.splitlines()[2:] == [
+        'bot_pool{state="inf"} +Inf',
+        'bot_pool{state="nan"} NaN',
+        'bot_pool{state="negative"} -Inf',
+        'bot_pool{state="size"} 10',
+    ]
+
+
+def test_each_metric_has_help_and_type_once():
+    counter = Counter("bot_a_total", "A", ("x",))
+    counter.inc("1")
+    counter.inc("2")
+    histogram = Histogram("bot_b_seconds", "B")
+    histogram.observe(0.2)
+
+    text = _render(counter, histogram)
+    _assert_valid(text)
+    assert re.findall(r"^# TYPE (\S+) (\S+)$", text, re.M) == [("bot_a_total", "counter"), ("bot_b_seconds", "histogram")]
+    assert len(re.findall(r"^# HELP ", text, re.M)) == 2
+
+
+def test_registry_of_the_bot_is_valid():
+    from dummy_bot.internal.utils.bot_session import HTTP_CONNECTIONS
+    from dummy_bot.internal.utils.metrics import HANDLER_DURATION, REGISTRY
+
+    HANDLER_DURATION.observe(0.01, "TextRouter.handle_text")
+    HTTP_CONNECTIONS.inc("new")
+
+    _assert_valid(REGISTRY.render())
@@ -0,0 +1,147 @@
+import asyncio
+import inspect
+import time
+from typing import List
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import DeleteMessage, SetMessageReaction
+
+from dummy_bot.internal.middleware.telegram_mw import RateLimitMiddleware
+from dummy_bot.internal.utils.outbound import OutboundScheduler, Priority, TokenBucket
+from dummy_bot.internal.utils.tracing import TRACER, InMemorySpanExporter
+
+CHAT_ID = -100
+
+
+def test_waiters_get_tokens_by_priority():
+    async def run() -> List[Priority]:
+        bucket = TokenBucket(rate=100, burst=1)
+        await bucket.acquire()
+
+        order = []
+
+        async def wait(priority: Priority) -> None:
+            await bucket.acquire(priority)
+            order.append(priority)
+
+        # ждут в порядке поступления, токены получают по приоритету
+        await asyncio.gather(*(wait(p) for p in (Priority.REACTION, Priority.NORMAL, Priority.MODERATION)))
+        return order
+
+    assert asyncio.run(run()) == [Priority.MODERATION, Priority.NORMAL, Priority.REACTION]
+
+
+def test_pause_holds_tokens():
+    async def run() -> float:
+        bucket = TokenBucket(rate=1000, burst=5)
+        bucket.pause(0.1)
+
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.09
+
+
+class RecordingScheduler:
+    def __init__(self) -> None:
+        self.acquired = []
+        self.paused = []
+
+    async def acquire(self, chat_id, priority) -> None:
+        self.acquired.append((chat_id, priority))
+
+    def pause(self, chat_id, seconds) -> None:
+        self.paused.append((chat_id, seconds))
+
+
+def test_retry_after_pauses_chat_and_retries():
+    scheduler = RecordingScheduler()
+    method = SetMessageReaction(chat_id=CHAT_ID, message_id=1)
+    calls = []
+
+    async def make_request(bot, m):
+        calls.append(m)
+        if len(calls) == 1:
+            raise TelegramRetryAfter(method=m, message="Too Many Requests", retry_after=7)
+        return True
+
+    assert asyncio.run(RateLimitMiddleware(scheduler)(make_request, None, method))
+    assert len(calls) == 2
+    assert scheduler.paused == [(CHAT_ID, 7)]
+    assert scheduler.acquired == [(CHAT_ID, Priority.REACTION)] * 2
+
+
+def test_moderation_has_priority():
+    scheduler = RecordingScheduler()
+
+    async def make_request(bot, m):
+        return True
+
+    asyncio.run(RateLimitMiddleware(scheduler)(make_request, None, DeleteMessage(chat_id=CHAT_ID, message_id=1)))
+    assert scheduler.acquired == [(CHAT_ID, Priority.MODERATION)]
+
+
+def test_background_overflow_is_per_chat():
+    async def run():
+        scheduler = OutboundScheduler(max_background_per_chat=2)
+        release = asyncio.Event()
+        done = []
+
+        async def request(chat_id: int) -> None:
+            await release.wait()
+            done.append(chat_id)
+
+        scheduler.spawn(request(CHAT_ID), CHAT_ID)
+        scheduler.spawn(request(CHAT_ID), CHAT_ID)
+        dropped = request(CHAT_ID)
+        scheduler.spawn(dropped, CHAT_ID)
+        # флуд в одном чате не отнимает место у другого
+        scheduler.spawn(request(CHAT_ID - 1), CHAT_ID - 1)
+
+        release.set()
+        await scheduler.drain()
+        return scheduler.dropped, inspect.getcoroutinestate(dropped), sorted(done)
+
+    dropped, state, done = asyncio.run(run())
+    assert dropped == 1
+    assert state == inspect.CORO_CLOSED
+    assert done == [CHAT_ID - 1, CHAT_ID, CHAT_ID]
+
+
+def test_background_request_has_own_linked_trace():
+    exporter = InMemorySpanExporter()
+    TRACER.configure(exporter)
+
+    async def run():
+        scheduler = OutboundScheduler()
+        release = asyncio.Event()
+
+        async def react() -> None:
+            await release.wait()
+            with TRACER.span("telegram.setMessageReaction"):
+                pass
+
+        with TRACER.span("update", root=True) as handler_span:
+            scheduler.spawn(react(), CHAT_ID)
+
+        # трейс хендлера экспортирован раньше, чем выполнился фоновый запрос
+        exported_before = len(exporter.traces)
+        release.set()
+        await scheduler.drain()
+        return handler_span, exported_before
+
+    try:
+        handler_span, exported_before = asyncio.run(run())
+    finally:
+        TRACER.configure(None)
+
+    assert exported_before == 1
+    handler_trace, background_trace = exporter.traces
+    assert [span.name for span in handler_trace] == ["update"]
+    assert [span.name for span in background_trace] == ["telegram.setMessageReaction", "outbound.background"]
+
+    root = background_trace[-1]
+    assert root.parent_id is None and root.trace_id != handler_span.trace_id
+    assert root.attributes["link.trace_id"] == handler_span.trace_id
+    assert root.attributes["link.span_id"] == handler_span.span_id
@@ -0,0 +1,111 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List
+
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+
+from dummy_bot.internal.dto.dto import PokakRecordDTO
+from dummy_bot.internal.usecase.pokak_batch import PokakBatchWriter
+
+CHAT_ID = -100
+
+
+class Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class UOW:
+    def __init__(self, commit_errors: List[Exception]) -> None:
+        self.commit_errors = commit_errors
+
+    @asynccontextmanager
+    async def with_tx(self, _):
+        yield
+        if self.commit_errors:
+            raise self.commit_errors.pop(0)
+
+
+class PokakRepo:
+    def __init__(self, errors: List[Exception]) -> None:
+        self.errors = errors
+        self.calls = 0
+
+    async def insert_batch_if_tracked(self, _, records: List[PokakRecordDTO]):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return [(r.chat_id, r.user_chat_id) for r in records]
+
+
+class Leaderboard:
+    def __init__(self) -> None:
+        self.increments = []
+
+    async def increment(self, chat_id: int, user_id: int) -> None:
+        self.increments.append((chat_id, user_id))
+
+
+class ReportCache:
+    def invalidate(self, chat_id: int) -> None: ...
+
+
+def _flush(repo: PokakRepo, uow: UOW) -> PokakBatchWriter:
+    writer = PokakBatchWriter(
+        session_pool=Session, pokak_repo=repo, leaderboard_repo=Leaderboard(),
+        report_cache=ReportCache(), uow=uow, flush_interval=0,
+    )
+    batch = [PokakRecordDTO(CHAT_ID, user, "media", datetime.now()) for user in (1, 2)]
+    asyncio.run(writer._flush(batch))
+    return writer
+
+
+def _connection_lost() -> OperationalError:
+    return OperationalError("INSERT", {}, ConnectionResetError("connection lost"))
+
+
+def test_connection_error_before_commit_is_retried():
+    repo = PokakRepo([_connection_lost()])
+    writer = _flush(repo, UOW([]))
+
+    assert repo.calls == 2
+    assert (writer.written, writer.dropped) == (2, 0)
+
+
+def test_serialization_failure_is_retried():
+    class SerializationError(Exception):
+        sqlstate = "40001"
+
+    repo = PokakRepo([DBAPIError("INSERT", {}, SerializationError("could not serialize access"))])
+    writer = _flush(repo, UOW([]))
+
+    assert repo.calls == 2
+    assert writer.written == 2
+
+
+def test_commit_error_is_not_retried():
+    repo = PokakRepo([])
+    writer = _flush(repo, UOW([_connection_lost()]))
+
+    assert repo.calls == 1
+    assert (writer.written, writer.dropped) == (0, 2)
+
+
+def test_non_retryable_error_is_not_retried():
+    repo = PokakRepo([IntegrityError("INSERT", {}, Exception("fk violation"))])
+    writer = _flush(repo, UOW([]))
+
+    assert repo.calls == 1
+    assert writer.dropped == 2
+
+
+def test_retries_are_bounded():
+    repo = PokakRepo([_connection_lost() for _ in range(5)])
+    writer = _flush(repo, UOW([]))
+
+    assert repo.calls == 3
+    assert (writer.written, writer.dropped) == (0, 2)
@@ -0,0 +1,64 @@
+import asyncio
+
+from dummy_bot.internal.utils.report_cache import ReportCache
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+
+CHAT_ID = -100
+
+
+async def _statistics(cache: ReportCache, computed: asyncio.Event, release: asyncio.Event) -> None:
+    """Как хендлер статистики: промах, запрос в БД, запись отчёта"""
+    report, generation = cache.get(CHAT_ID, PeriodEnum.WEEK)
+    assert report is None
+
+    computed.set()
+    await release.wait()
+    cache.set(CHAT_ID, PeriodEnum.WEEK, "stale", generation)
+
+
+def test_invalidate_during_compute_drops_report():
+    async def run():
+        cache = ReportCache()
+        computed, release = asyncio.Event(), asyncio.Event()
+        handler = asyncio.create_task(_statistics(cache, computed, release))
+
+        await computed.wait()
+        # покак записан, пока отчёт считался по старым данным
+        cache.invalidate(CHAT_ID)
+        release.set()
+        await handler
+
+        return cache.get(CHAT_ID, PeriodEnum.WEEK)
+
+    report, _ = asyncio.run(run())
+    assert report is None
+
+
+def test_set_after_invalidate_with_fresh_generation():
+    cache = ReportCache()
+    cache.invalidate(CHAT_ID)
+
+    _, generation = cache.get(CHAT_ID, PeriodEnum.WEEK)
+    assert cache.set(CHAT_ID, PeriodEnum.WEEK, "fresh", generation)
+    assert cache.get(CHAT_ID, PeriodEnum.WEEK) == ("fresh", generation)
+
+
+def test_invalidate_is_per_chat():
+    cache = ReportCache()
+    _, generation = cache.get(CHAT_ID, PeriodEnum.WEEK)
+    cache.invalidate(CHAT_ID - 1)
+
+    assert cache.set(CHAT_ID, PeriodEnum.WEEK, "report", generation)
+
+
+def test_invalidations_are_bounded():
+    cache = ReportCache(maxsize=2)
+    _, generation = cache.get(CHAT_ID, PeriodEnum.WEEK)
+    for chat_id in range(CHAT_ID, CHAT_ID - 3, -1):
+        cache.invalidate(chat_id)
+
+    # инвалидация CHAT_ID вытеснена, но отчёт, посчитанный до неё, всё равно отброшен
+    assert not cache.set(CHAT_ID, PeriodEnum.WEEK, "stale", generation)
+
+    _, generation = cache.get(CHAT_ID, PeriodEnum.WEEK)
+    assert cache.set(CHAT_ID, PeriodEnum.WEEK, "fresh", generation)
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Awaitable, Callable, List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from dummy_bot.internal.database.transactional.uow import UOW
+from dummy_bot.internal.dto.dto import TelegramMessageDTO
+from dummy_bot.internal.models.models import Base
+from dummy_bot.internal.repository.group import GroupRepository
+from dummy_bot.internal.repository.media import MediaRepository
+from dummy_bot.internal.repository.pokak import PokakRepository
+from dummy_bot.internal.repository.user import UserRepository
+from dummy_bot.internal.usecase.commands import CommandsUseCase
+from dummy_bot.internal.usecase.media import MediaUseCase
+from dummy_bot.internal.usecase.pokak import PokakUseCase
+from dummy_bot.internal.utils.lookup_cache import LookupCache
+from dummy_bot.internal.utils.report_cache import ReportCache
+
+CHAT_ID = -100
+USER_CHAT_ID = 7
+
+
+class Leaderboard:
+    async def increment(self, chat_id: int, user_id: int) -> None: ...
+
+    async def invalidate(self, chat_id: int) -> None: ...
+
+
+def _dto(media: str | None = None) -> TelegramMessageDTO:
+    return TelegramMessageDTO(CHAT_ID, USER_CHAT_ID, "user", "User", None, media)
+
+
+@pytest.fixture
+def statements() -> List[List[str]]:
+    """
+    SQL, отправленный в БД каждым шагом сценария: запись в группу - один запрос,
+    без SELECT для refresh после INSERT/UPDATE
+    """
+    lookup_cache, report_cache, uow = LookupCache(), ReportCache(), UOW()
+    commands = CommandsUseCase(GroupRepository(), UserRepository(), Leaderboard(), lookup_cache, report_cache, uow)
+    media = MediaUseCase(GroupRepository(), MediaRepository(), lookup_cache, uow)
+    pokak = PokakUseCase(
+        UserRepository(), GroupRepository(), MediaRepository(), PokakRepository(),
+        Leaderboard(), lookup_cache, report_cache, uow,
+    )
+
+    steps: List[Callable[[AsyncSession], Awaitable]] = [
+        lambda session: commands.start(session, _dto()),
+        lambda session: commands.join(session, _dto()),
+        lambda session: media.set_media(session, _dto("first")),
+        lambda session: media.set_media(session, _dto("second")),
+        # первый покак заполняет кэш медиа и участника, второй - только INSERT
+        lambda session: pokak.add(session, _dto("second")),
+        lambda session: pokak.add(session, _dto("second")),
+        lambda session: commands.leave(session, _dto()),
+    ]
+
+    async def run() -> List[List[str]]:
+        engine = create_async_engine("sqlite+aiosqlite://")
+        executed: List[str] = []
+        event.listen(
+            engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *args: executed.append(statement.split(None, 1)[0].upper()),
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            session_pool = async_sessionmaker(bind=engine, expire_on_commit=False, autobegin=False)
+            result = []
+            for step in steps:
+                executed.clear()
+                async with session_pool() as session:
+                    await step(session)
+                result.append(list(executed))
+            return result
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_start_is_one_statement(statements):
+    assert statements[0] == ["INSERT"]
+
+
+def test_join_is_one_statement(statements):
+    assert statements[1] == ["INSERT"]
+
+
+def test_set_media_writes_once(statements):
+    assert statements[2] == ["SELECT", "SELECT", "INSERT"]
+    assert statements[3] == ["SELECT", "SELECT", "UPDATE"]
+
+
+def test_pokak_add_is_one_statement(statements):
+    assert statements[4].count("INSERT") == 1
+    assert statements[5] == ["INSERT"]
+
+
+def test_leave_is_one_statement(statements):
+    assert statements[6] == ["UPDATE"]
@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+
+from dummy_bot.internal.dto.dto import StatisticFilterDTO, TelegramMessageDTO, UserStatInfoDTO
+from dummy_bot.internal.usecase.statistics import StatisticsUseCase
+from dummy_bot.internal.utils.stat_flter import PeriodEnum
+
+CHAT_ID = -100
+PRIMARY, REPLICA = "primary", "replica"
+
+
+class GroupRepo:
+    async def get_by_chat_id(self, session, chat_id):
+        return object()
+
+
+class StatRepo:
+    def __init__(self) -> None:
+        self.sessions: List[str] = []
+
+    async def statistics(self, session, group, f):
+        self.sessions.append(session)
+        return [UserStatInfoDTO(user_id=1, username=session, fullname=session, count=1)]
+
+
+class LeaderboardRepo:
+    def __init__(self) -> None:
+        self.rebuilt = []
+
+    async def top(self, chat_id, period, limit):
+        return None
+
+    async def version(self, chat_id):
+        return 1
+
+    async def rebuild(self, chat_id, period, data, version):
+        self.rebuilt.append(data)
+        return True
+
+
+class UOW:
+    @asynccontextmanager
+    async def _tx(self, session):
+        yield
+
+    readonly = snapshot = with_tx = _tx
+
+
+@asynccontextmanager
+async def replica_pool():
+    yield REPLICA
+
+
+def _use_case():
+    stat_repo, leaderboard = StatRepo(), LeaderboardRepo()
+    use_case = StatisticsUseCase(GroupRepo(), stat_repo, leaderboard, UOW(), read_session_pool=replica_pool)
+    return use_case, stat_repo, leaderboard
+
+
+def _request(period: PeriodEnum | None):
+    dto = TelegramMessageDTO(CHAT_ID, 1, None, None, None, None)
+    return dto, StatisticFilterDTO(start_date=None, end_date=None, period=period)
+
+
+def test_leaderboard_is_rebuilt_from_primary():
+    use_case, stat_repo, leaderboard = _use_case()
+    asyncio.run(use_case.statistics(PRIMARY, *_request(PeriodEnum.WEEK)))
+
+    # отстающая реплика не должна попасть в рейтинг, который живёт до истечения TTL
+    assert stat_repo.sessions == [PRIMARY]
+    assert [row.username for row in leaderboard.rebuilt[0]] == [PRIMARY]
+
+
+def test_arbitrary_filter_is_read_from_replica():
+    use_case, stat_repo, leaderboard = _use_case()
+    asyncio.run(use_case.statistics(PRIMARY, *_request(None)))
+
+    assert stat_repo.sessions == [REPLICA]
+    assert leaderboard.rebuilt == []
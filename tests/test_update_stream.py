@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.asyncio import Redis
+
+from dummy_bot.internal.database.redis.update_stream import ShardLeaseLost, UpdateStream
+
+SHARD = 0
+
+
+class Cache:
+    def __init__(self) -> None:
+        self.client: Redis = FakeAsyncRedis(decode_responses=True)
+
+    def key(self, key: str) -> str:
+        return f"3:{key}"
+
+
+def test_keys_are_prefixed():
+    async def run():
+        cache = Cache()
+        await UpdateStream(cache).publish(SHARD, "{}")
+        return await cache.client.keys("*")
+
+    assert asyncio.run(run()) == ["3:updates:0"]
+
+
+def test_shard_is_read_by_lease_owner_only():
+    async def run():
+        cache = Cache()
+        first, second = UpdateStream(cache, consumer="first"), UpdateStream(cache, consumer="second")
+        await first.publish(SHARD, "update")
+
+        entry_id = (await cache.client.xrange("3:updates:0"))[0][0]
+        async with first.lease(SHARD):
+            assert await anext(first.read(SHARD, block_ms=10)) == (entry_id, "update")
+
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(second.lease(SHARD).__aenter__(), 0.2)
+
+        return await cache.client.get("3:updates:0:lease")
+
+    # после выхода из lease аренда освобождена
+    assert asyncio.run(run()) is None
+
+
+def test_pending_updates_of_previous_process_are_claimed():
+    async def run():
+        cache = Cache()
+        previous, current = UpdateStream(cache, consumer="previous"), UpdateStream(cache, consumer="current")
+        await previous.publish(SHARD, "first")
+        await previous.publish(SHARD, "second")
+
+        # процесс прочитал апдейт и упал до ack; аренда освобождена по истечении срока
+        async with previous.lease(SHARD):
+            entry_id, _ = await anext(previous.read(SHARD, block_ms=10))
+
+        async with current.lease(SHARD):
+            reader = current.read(SHARD, block_ms=10)
+            replayed = [await anext(reader), await anext(reader)]
+            await reader.aclose()
+
+        consumers = await cache.client.xinfo_consumers("3:updates:0", "workers")
+        return entry_id, replayed, [consumer["name"] for consumer in consumers]
+
+    entry_id, replayed, consumers = asyncio.run(run())
+    assert replayed[0] == (entry_id, "first")
+    assert replayed[1][1] == "second"
+    assert consumers == ["current"]
+
+
+def test_lease_is_renewed_during_long_processing():
+    async def run():
+        cache = Cache()
+        stream = UpdateStream(cache, consumer="first", lease_ms=60)
+        async with stream.lease(SHARD):
+            # обработка дольше срока аренды, между апдейтами никто не продлевает
+            await asyncio.sleep(0.2)
+            return await cache.client.get("3:updates:0:lease")
+
+    assert asyncio.run(run()) == "first"
+
+
+def test_lost_lease_cancels_processing():
+    async def run():
+        cache = Cache()
+        stream = UpdateStream(cache, consumer="first", lease_ms=30)
+        processed = False
+
+        with pytest.raises(ShardLeaseLost):
+            async with stream.lease(SHARD):
+                # аренду взял другой воркер, пока апдейт обрабатывался
+                await cache.client.set("3:updates:0:lease", "second")
+                await asyncio.sleep(1)
+                processed = True
+
+        return processed, await cache.client.get("3:updates:0:lease")
+
+    assert asyncio.run(run()) == (False, "second")